@@ -105,8 +105,11 @@ class TraefikRouteCharm(CharmBase):
 ```
 """
 
+import copy
+import hashlib
+import json
 import logging
-from typing import Optional
+from typing import Dict, Optional
 
 import yaml
 from ops.charm import CharmBase, CharmEvents, RelationEvent
@@ -123,8 +126,29 @@ LIBAPI = 0
 # to 0 if you are raising the major API version
 LIBPATCH = 5
 
+# This copy is forked from upstream LIBPATCH 5: TraefikRouteProvider and the requirer's
+# address lookup snapshot relation data once per dispatch, and the provider can tell
+# whether a relation's config changed since its owner last applied it. `charmcraft fetch-lib`
+# would drop these changes, so port them upstream before fetching a newer patch.
+
 log = logging.getLogger(__name__)
 
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
+
+
+def _remote_app_data(snapshots: Dict[int, Dict[str, str]], relation: Relation) -> Dict[str, str]:
+    """Return a snapshot of the remote application databag of a relation.
+
+    The remote databag cannot change during a dispatch, so it is copied once and
+    served from ``snapshots`` until the owner drops it on a relation event.
+    """
+    if relation.id not in snapshots:
+        snapshots[relation.id] = dict(relation.data[relation.app]) if relation.app else {}
+    return snapshots[relation.id]
+
 
 class TraefikRouteException(RuntimeError):
     """Base class for exceptions raised by TraefikRoute."""
@@ -191,10 +215,15 @@ class TraefikRouteProvider(Object):
             scheme: The scheme.
         """
         super().__init__(charm, relation_name)
-        self._stored.set_default(external_host=None, scheme=None)
+        self._stored.set_default(external_host=None, scheme=None, config_hashes={})
 
         self._charm = charm
         self._relation_name = relation_name
+        # Remote databags and the stored address, read at most once per dispatch.
+        self._snapshots: Dict[int, Dict[str, str]] = {}
+        self._stored_fresh = False
+        # Dynamic configs parsed this dispatch, by content hash.
+        self._parsed: Dict[str, dict] = {}
 
         if (
             self._stored.external_host != external_host  # pyright: ignore
@@ -236,28 +265,38 @@ class TraefikRouteProvider(Object):
         allows for reuse both when the property is called and if the relation changes, so a
         leader change where the new leader checks the property will do the right thing.
         """
-        if not self._charm.unit.is_leader():
+        if self._stored_fresh or not self._charm.unit.is_leader():
             return
 
+        self._stored_fresh = True
         for relation in self._charm.model.relations[self._relation_name]:
             if not relation.app:
                 self._stored.external_host = ""
                 self._stored.scheme = ""
                 return
-            external_host = relation.data[relation.app].get("external_host", "")
+            remote_data = _remote_app_data(self._snapshots, relation)
+            external_host = remote_data.get("external_host", "")
             self._stored.external_host = (
                 external_host or self._stored.external_host  # pyright: ignore
             )
-            scheme = relation.data[relation.app].get("scheme", "")
+            scheme = remote_data.get("scheme", "")
             self._stored.scheme = scheme or self._stored.scheme  # pyright: ignore
 
+    def _forget(self, relation: Relation) -> None:
+        """Drop what was read from a relation, whose data may have changed."""
+        self._snapshots.pop(relation.id, None)
+        self._stored_fresh = False
+
     def _on_relation_changed(self, event: RelationEvent) -> None:
+        self._forget(event.relation)
         if self.is_ready(event.relation):
             # todo check data is valid here?
             self.update_traefik_address()
             self.on.ready.emit(relation=event.relation, app=event.relation.app)
 
     def _on_relation_broken(self, event: RelationEvent) -> None:
+        self._forget(event.relation)
+        self._stored.config_hashes.pop(str(event.relation.id), None)  # pyright: ignore
         self.on.data_removed.emit(relation=event.relation, app=event.relation.app)
 
     def update_traefik_address(
@@ -281,9 +320,7 @@ class TraefikRouteProvider(Object):
 
         Returns True when the remote app shared the config; False otherwise.
         """
-        if not relation.app or not relation.data[relation.app]:
-            return False
-        return "config" in relation.data[relation.app]
+        return "config" in _remote_app_data(self._snapshots, relation)
 
     def get_config(self, relation: Relation) -> Optional[str]:
         """Renamed to ``get_dynamic_config``."""
@@ -297,19 +334,65 @@ class TraefikRouteProvider(Object):
         """Retrieve the dynamic config published by the remote application."""
         if not self.is_ready(relation):
             return None
-        return relation.data[relation.app].get("config")
+        return _remote_app_data(self._snapshots, relation).get("config")
+
+    def get_dynamic_config_hash(self, relation: Relation) -> Optional[str]:
+        """Return the SHA-256 of the dynamic config published on a relation, if any."""
+        config = self.get_dynamic_config(relation)
+        if config is None:
+            return None
+        return hashlib.sha256(config.encode()).hexdigest()
+
+    def get_parsed_dynamic_config(self, relation: Relation) -> Optional[dict]:
+        """Return a copy of the dynamic config published on a relation, parsed.
+
+        Each distinct config is parsed once per dispatch, however many relations
+        publish it or however often it is read.
+        """
+        digest = self.get_dynamic_config_hash(relation)
+        if digest is None:
+            return None
+        if digest not in self._parsed:
+            config = _remote_app_data(self._snapshots, relation)["config"]
+            # Compact configs are JSON, which json parses much faster than YAML.
+            # A YAML flow mapping also starts with "{", so fall back to YAML.
+            try:
+                self._parsed[digest] = json.loads(config)
+            except ValueError:
+                self._parsed[digest] = yaml.load(config, Loader=_SafeLoader)
+        return copy.deepcopy(self._parsed[digest])
+
+    def mark_dynamic_config_applied(self, relation: Relation) -> None:
+        """Remember the relation's current dynamic config as the one last applied.
+
+        Call this once the config is in effect; see ``is_dynamic_config_changed``.
+        """
+        digest = self.get_dynamic_config_hash(relation)
+        if digest is None:
+            self._stored.config_hashes.pop(str(relation.id), None)  # pyright: ignore
+        else:
+            self._stored.config_hashes[str(relation.id)] = digest  # pyright: ignore
+
+    def is_dynamic_config_changed(self, relation: Relation) -> bool:
+        """Whether the relation's dynamic config differs from the one last applied.
+
+        Lets Traefik skip re-parsing and reloading a config on relation-changed
+        events that only touched other fields.
+        """
+        last_hash = self._stored.config_hashes.get(str(relation.id))  # pyright: ignore
+        return self.get_dynamic_config_hash(relation) != last_hash
 
     def is_raw_enabled(self, relation: Relation) -> bool:
         """Check if the raw config mode is enabled by the remote application."""
         if not self.is_ready(relation):
             return False
-        return relation.data[relation.app].get("raw") == "True"
+        return _remote_app_data(self._snapshots, relation).get("raw") == "True"
 
     def get_static_config(self, relation: Relation) -> Optional[str]:
         """Retrieve the static config published by the remote application."""
         if not self.is_ready(relation):
             return None
-        return relation.data[relation.app].get("static")
+        return _remote_app_data(self._snapshots, relation).get("static")
 
 
 class TraefikRouteRequirer(Object):
@@ -356,6 +439,9 @@ class TraefikRouteRequirer(Object):
         self._charm = charm
         self._relation = relation
         self._raw = raw
+        # Remote databags and the stored address, read at most once per dispatch.
+        self._snapshots: Dict[int, Dict[str, str]] = {}
+        self._stored_fresh = False
 
         if self._raw:
             log.warning(
@@ -392,30 +478,39 @@ class TraefikRouteRequirer(Object):
         allows for reuse both when the property is called and if the relation changes, so a
         leader change where the new leader checks the property will do the right thing.
         """
-        if not self._charm.unit.is_leader():
+        if self._stored_fresh or not self._charm.unit.is_leader():
             return
 
+        self._stored_fresh = True
         if self._relation:
             for relation in self._charm.model.relations[self._relation.name]:
                 if not relation.app:
                     self._stored.external_host = ""
                     self._stored.scheme = ""
                     return
-                external_host = relation.data[relation.app].get("external_host", "")
+                remote_data = _remote_app_data(self._snapshots, relation)
+                external_host = remote_data.get("external_host", "")
                 self._stored.external_host = (
                     external_host or self._stored.external_host  # pyright: ignore
                 )
-                scheme = relation.data[relation.app].get("scheme", "")
+                scheme = remote_data.get("scheme", "")
                 self._stored.scheme = scheme or self._stored.scheme  # pyright: ignore
 
+    def _forget(self, relation: Relation) -> None:
+        """Drop what was read from a relation, whose data may have changed."""
+        self._snapshots.pop(relation.id, None)
+        self._stored_fresh = False
+
     def _on_relation_changed(self, event: RelationEvent) -> None:
         """Update StoredState with external_host and other information from Traefik."""
+        self._forget(event.relation)
         self._update_stored()
         if self._charm.unit.is_leader():
             self.on.ready.emit(relation=event.relation, app=event.relation.app)
 
     def _on_relation_broken(self, event: RelationEvent) -> None:
         """On RelationBroken, clear the stored data if set and emit an event."""
+        self._forget(event.relation)
         self._stored.external_host = ""
         if self._charm.unit.is_leader():
             self.on.ready.emit(relation=event.relation, app=event.relation.app)
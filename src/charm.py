@@ -12,178 +12,594 @@ develop a new k8s charm using the Operator Framework:
 https://juju.is/docs/sdk/create-a-minimal-kubernetes-charm
 """
 
+import contextlib
+import functools
+import hashlib
+import json
 import logging
-import re
-from typing import Optional
+from typing import TYPE_CHECKING, ContextManager, Mapping, Optional
 
 import ops
-import yaml
-from charms.traefik_k8s.v0.traefik_route import TraefikRouteRequirer
+
+# Modules only needed to analyse, render or publish a map are imported where they are
+# used, so that dispatches with nothing to publish (non-leader units, unobserved hooks)
+# do not pay for loading them. ops itself already loads yaml and re.
+if TYPE_CHECKING:
+    from layout_planner import Budget, LayoutPlan
+    from reconcile_profile import ReconcileProfile
+    from redirect_analysis import AnalysisReport
+    from redirect_render import RedirectRenderer
+    from redirect_validation import ValidationReport
+    from render_cache import RenderCache
 
 logger = logging.getLogger(__name__)
 
 RELATION_NAME = "traefik-route"
+# Findings returned per category by the analyze-redirects action.
+ACTION_FINDINGS_LIMIT = 100
+# Reconcile profiles kept in StoredState for the reconcile-profiles action.
+PROFILE_HISTORY = 20
+REDIRECT_MAP_RESOURCE = "redirect-map"
+# Per-entry fragments of the last render, reused for entries that did not change.
+RENDER_CACHE_FILE = ".redirect-render-cache.json"
 
 
 class TraefikK8SPathRedirectorCharm(ops.CharmBase):
     """Publish a Traefik route for path redirects."""
 
+    _stored = ops.StoredState()
+
     def __init__(self, framework: ops.Framework):
         super().__init__(framework)
-        self._route_requirer: Optional[TraefikRouteRequirer] = None
+        self._fingerprints: dict[int, str] = {}
+        self._plans: dict[int, "LayoutPlan"] = {}
+        self._render_cache: Optional["RenderCache"] = None
+        self._profile: Optional["ReconcileProfile"] = None
         self.framework.observe(self.on.config_changed, self._on_reconcile)
         self.framework.observe(self.on.leader_elected, self._on_reconcile)
-        self.framework.observe(self.on.upgrade_charm, self._on_reconcile)
-        self.framework.observe(self.on[RELATION_NAME].relation_created, self._on_relation_created)
-        self._ensure_route_requirer()
+        self.framework.observe(self.on.upgrade_charm, self._on_upgrade_charm)
+        # The charm writes the traefik-route databags itself, see _publish, so it
+        # observes the relation events directly rather than through a requirer.
+        self.framework.observe(self.on[RELATION_NAME].relation_created, self._on_reconcile)
+        self.framework.observe(self.on[RELATION_NAME].relation_changed, self._on_reconcile)
+        self.framework.observe(self.on[RELATION_NAME].relation_broken, self._on_reconcile)
+        self.framework.observe(self.on.analyze_redirects_action, self._on_analyze_redirects_action)
+        self.framework.observe(
+            self.on.reconcile_profiles_action, self._on_reconcile_profiles_action
+        )
+        self.framework.observe(self.on.test_redirect_action, self._on_test_redirect_action)
+        self.framework.observe(
+            self.on.validate_redirects_action, self._on_validate_redirects_action
+        )
 
-    def _on_relation_created(self, event: ops.RelationEvent) -> None:
-        self._ensure_route_requirer(event.relation)
-        self._on_reconcile(event)
+    def _on_analyze_redirects_action(self, event: ops.ActionEvent) -> None:
+        direct_redirects, error = self._loaded_redirects
+        if error:
+            event.fail(error)
+            return
 
-    def _on_route_ready(self, event: ops.EventBase) -> None:
-        self._on_reconcile(event)
+        results: dict[str, object] = {"redirects": len(direct_redirects)}
+        for category, findings in self._analysis.as_dict().items():
+            results[category] = {
+                "count": len(findings),
+                "findings": json.dumps(findings[:ACTION_FINDINGS_LIMIT]),
+            }
+        event.set_results(results)
 
-    def _ensure_route_requirer(self, relation: Optional[ops.Relation] = None) -> None:
-        if self._route_requirer:
+    def _on_reconcile_profiles_action(self, event: ops.ActionEvent) -> None:
+        limit = int(event.params.get("limit", 10))
+        if not 1 <= limit <= PROFILE_HISTORY:
+            event.fail(f"limit must be between 1 and {PROFILE_HISTORY}")
             return
-        relation = relation or self.model.get_relation(RELATION_NAME)
-        if not relation:
-            return
-        self._route_requirer = TraefikRouteRequirer(self, relation, RELATION_NAME, raw=True)
-        self.framework.observe(self._route_requirer.on.ready, self._on_route_ready)
+        self._stored.set_default(reconcile_profiles=[])
+        profiles = [json.loads(profile) for profile in self._stored.reconcile_profiles][-limit:]
+        event.set_results({"count": len(profiles), "profiles": json.dumps(profiles)})
 
-    def _on_reconcile(self, event: ops.EventBase) -> None:
-        direct_redirects, error = self._parse_redirect_map(
-            self.model.config["direct_path_redirects"], "direct_path_redirects"
-        )
+    def _on_test_redirect_action(self, event: ops.ActionEvent) -> None:
+        from route_evaluator import RouteIndex
+
+        direct_redirects, error = self._checked_redirects
         if error:
-            self.unit.status = ops.BlockedStatus(error)
+            event.fail(error)
             return
 
-        error = self._validate_paths(direct_redirects)
-        if error:
-            self.unit.status = ops.BlockedStatus(error)
+        urls = event.params["urls"].replace(",", " ").split()
+        indexes = {
+            relation_id: RouteIndex(json.loads(config))
+            for relation_id, config in self._published_configs(direct_redirects).items()
+        }
+        results = []
+        try:
+            for url in urls:
+                # The first shard with a router for the URL is the one serving it.
+                evaluations = {
+                    relation_id: index.evaluate(url) for relation_id, index in indexes.items()
+                }
+                relation_id = next(
+                    (key for key, evaluation in evaluations.items() if evaluation.router),
+                    next(iter(evaluations)),
+                )
+                results.append({**evaluations[relation_id].as_dict(), "relation": relation_id})
+        except ValueError as exc:
+            event.fail(str(exc))
             return
+        event.set_results(
+            {
+                "count": len(results),
+                "redirected": sum(1 for result in results if result["target"]),
+                "loops": sum(1 for result in results if result["loop"]),
+                "results": json.dumps(results),
+            }
+        )
+
+    def _published_configs(self, direct_redirects: dict[str, str]) -> dict[Optional[int], str]:
+        """Return the config published to each relation, planned as the reconcile plans it.
+
+        Without a relation, the config a single relation would get is returned
+        under None.
+        """
+        relations = self.model.relations[RELATION_NAME]
+        if not relations:
+            return {None: self._plan_config(direct_redirects).config}
+        return {relation.id: self._rendered_config(relation).config for relation in relations}
 
-        self._ensure_route_requirer()
-        relation = self.model.get_relation(RELATION_NAME)
-        if not relation:
-            self.unit.status = ops.WaitingStatus("waiting for traefik-route relation")
+    def _on_validate_redirects_action(self, event: ops.ActionEvent) -> None:
+        from redirect_validation import REPORT_LIMIT
+
+        limit = int(event.params.get("limit", 100))
+        if not 1 <= limit <= REPORT_LIMIT:
+            event.fail(f"limit must be between 1 and {REPORT_LIMIT}")
+            return
+        _, error = self._loaded_redirects
+        report = self._validation
+        if error and not report.count:
+            # A map that is not a map at all stops loading before its entries are checked.
+            event.fail(error)
             return
+        event.set_results(
+            {
+                "count": report.count,
+                "issues": json.dumps([issue._asdict() for issue in report.issues[:limit]]),
+            }
+        )
+
+    def _on_upgrade_charm(self, event: ops.UpgradeCharmEvent) -> None:
+        # A new charm revision may render the same map differently.
+        self._stored.published_fingerprints = {}
+        self._on_reconcile(event)
+
+    def _publish(self, relation: ops.Relation, config: str) -> None:
+        """Write a serialized Traefik config to a relation's application databag.
+
+        The fields are those TraefikRouteRequirer.submit_to_traefik writes in raw
+        mode, but the requirer only publishes YAML dumped from a dict to the one
+        relation it was created with, while the charm publishes compact JSON it
+        serialized itself, to every traefik-route relation.
+        """
+        databag = relation.data[self.app]
+        # Unchanged fields are not rewritten, so that republishing the same config
+        # does not trigger relation-changed on the Traefik side.
+        for key, value in (("raw", "True"), ("config", config)):
+            if databag.get(key) != value:
+                databag[key] = value
 
+    def _on_reconcile(self, event: ops.EventBase) -> None:
+        # Only the leader publishes, so other units stop before loading the map.
         if not self.unit.is_leader():
             self.unit.status = ops.WaitingStatus("waiting for leader")
             return
 
-        if not self._route_requirer:
-            self.unit.status = ops.WaitingStatus("waiting for traefik-route relation")
-            return
+        from reconcile_profile import ReconcileProfile
+
+        profile = self._profile = ReconcileProfile(type(event).__name__)
+        status = self._reconcile()
+        self._profile = None
+        self._record_profile(profile, status)
+        self.unit.status = status
 
-        self._route_requirer.submit_to_traefik(config=self._build_traefik_config(direct_redirects))
-        self.unit.status = ops.ActiveStatus()
+    def _reconcile(self) -> ops.StatusBase:
+        direct_redirects, error = self._checked_redirects
+        if error:
+            return ops.BlockedStatus(error)
+
+        relations = self.model.relations[RELATION_NAME]
+        if not relations:
+            return ops.WaitingStatus("waiting for traefik-route relation")
+
+        self._stored.set_default(published_fingerprints={})
+        published = self._stored.published_fingerprints
+        for stale_id in set(published) - {str(relation.id) for relation in relations}:
+            del published[stale_id]
+
+        pending = {}
+        for relation in relations:
+            fingerprint = self._config_fingerprint(self._shards[relation.id], relation)
+            if (
+                fingerprint == published.get(str(relation.id))
+                and "config" in relation.data[self.app]
+            ):
+                logger.debug("redirects for relation %d unchanged, skipping", relation.id)
+            else:
+                pending[relation] = fingerprint
+
+        # Every shard is checked against the budget before any is published, so a
+        # map that does not fit leaves all Traefiks on their previous config.
+        budget = self._budget
+        for relation in pending:
+            plan = self._rendered_config(relation)
+            if not budget.admits(plan):
+                return ops.BlockedStatus(
+                    f"config for relation {relation.id} does not fit: "
+                    f"{budget.describe_excess(plan)}"
+                )
+
+        for relation, fingerprint in pending.items():
+            with self._stage("publish"):
+                self._publish(relation, self._rendered_config(relation).config)
+            published[str(relation.id)] = fingerprint
+        from render_cache import encoded_length
+
+        config_bytes = sum(
+            encoded_length(relation.data[self.app].get("config", "")) for relation in relations
+        )
+        if self._render_cache:
+            self._render_cache.save(shards={str(relation.id) for relation in relations})
+
+        self._count("entries", len(direct_redirects))
+        self._count("bytes", config_bytes)
+        count = len(direct_redirects)
+        return ops.ActiveStatus(
+            f"{count} redirect{'' if count == 1 else 's'}, {config_bytes / 1024:.1f} KiB published"
+        )
 
-    def _validate_paths(self, direct_redirects: dict[str, str]) -> Optional[str]:
-        if not direct_redirects:
-            return "at least one redirect must be configured"
+    def _stage(self, name: str) -> ContextManager[None]:
+        """Time a block as a stage of the current reconcile, if one is running."""
+        if not self._profile:
+            return contextlib.nullcontext()
+        return self._profile.stage(name)
+
+    def _count(self, name: str, value: int) -> None:
+        if self._profile:
+            self._profile.add(name, value)
+
+    def _record_profile(self, profile: "ReconcileProfile", status: ops.StatusBase) -> None:
+        """Log a reconcile's profile and keep it for the reconcile-profiles action.
+
+        Timings stay out of the unit status, which would otherwise change on every
+        leader hook, even those with nothing to publish.
+        """
+        record = profile.as_dict(status.name)
+        logger.debug(
+            "reconcile profile: %s",
+            ", ".join(f"{stage} {elapsed}ms" for stage, elapsed in record["ms"].items()),
+        )
+        logger.debug(
+            "reconcile sizes: %s",
+            ", ".join(f"{name} {value}" for name, value in profile.counts.items()),
+        )
+        # Kept serialized: StoredState wraps nested containers read back from it, and
+        # those wrappers cannot be stored again inside a new list.
+        self._stored.set_default(reconcile_profiles=[])
+        profiles = list(self._stored.reconcile_profiles)[-(PROFILE_HISTORY - 1) :]
+        self._stored.reconcile_profiles = profiles + [json.dumps(record)]
+
+    # A single dispatch can reconcile several times (e.g. upgrade-charm followed by a
+    # deferred event); the charm instance lives for one dispatch, so caching on it
+    # parses, validates and renders the map at most once per hook.
+    @functools.cached_property
+    def _loaded_redirects(self) -> tuple[dict[str, str], Optional[str]]:
+        with self._stage("parse"):
+            maps, error = self._load_redirects()
+        if error:
+            return {}, error
+        with self._stage("validate"):
+            return self._merge_redirects(*maps)
 
-        return self._validate_redirect_map(direct_redirects, "direct_path_redirects")
+    @functools.cached_property
+    def _checked_redirects(self) -> tuple[dict[str, str], Optional[str]]:
+        direct_redirects, error = self._loaded_redirects
+        if error:
+            return {}, error
+        with self._stage("validate"):
+            return self._check_redirects(direct_redirects)
 
-    def _validate_redirect_map(
-        self,
-        redirects: dict[str, str],
-        name: str,
-    ) -> Optional[str]:
-        for from_path, to_path in redirects.items():
-            if not from_path:
-                return f"{name} keys must be non-empty"
-            if not from_path.startswith("/"):
-                return f"{name} keys must start with '/'"
-            if not to_path:
-                return f"{name} values must be non-empty"
-            if not self._is_absolute_url(to_path) and not to_path.startswith("/"):
-                return f"{name} values must start with '/' or be an absolute URL"
-        return None
+    def _check_redirects(
+        self, direct_redirects: dict[str, str]
+    ) -> tuple[dict[str, str], Optional[str]]:
+        from redirect_maps import check_redirects
 
-    def _build_traefik_config(self, direct_redirects: dict[str, str]) -> dict:
-        routers: dict[str, dict] = {}
-        middlewares: dict[str, dict] = {}
-        index = 0
+        analysis = self._analysis
+        error = check_redirects(direct_redirects, self.model.config, analysis)
+        if error:
+            return {}, error
+        if analysis.chains or analysis.duplicates or analysis.shadowed:
+            logger.warning(
+                "redirect map has %d chains, %d duplicate groups and %d shadowed sources; "
+                "run the analyze-redirects action for details",
+                len(analysis.chains),
+                len(analysis.duplicates),
+                len(analysis.shadowed),
+            )
+        return direct_redirects, None
+
+    @functools.cached_property
+    def _analysis(self) -> "AnalysisReport":
+        from redirect_analysis import analyze_redirects
+        from redirect_render import int_option
+
+        return analyze_redirects(
+            self._loaded_redirects[0],
+            self._prefix_redirects[0],
+            ranked=int_option(self.model.config, "router_priority_base") > 0,
+        )
+
+    @functools.cached_property
+    def _shards(self) -> dict[int, dict[str, str]]:
+        from sharding import SHARD_BY_HOST, shard_redirects
+
+        relation_ids = [relation.id for relation in self.model.relations[RELATION_NAME]]
+        strategy = str(self.model.config.get("shard_by", SHARD_BY_HOST))
+        return shard_redirects(self._checked_redirects[0], relation_ids, strategy)
+
+    def _rendered_config(self, relation: ops.Relation) -> "LayoutPlan":
+        if relation.id not in self._plans:
+            with self._stage("render"):
+                plan = self._plan_config(self._shards[relation.id], str(relation.id))
+            self._count("routers", plan.routers)
+            self._count("middlewares", plan.middlewares)
+            self._plans[relation.id] = plan
+        return self._plans[relation.id]
+
+    @property
+    def _budget(self) -> "Budget":
+        from layout_planner import Budget
+
+        return Budget(
+            max_bytes=int(self.model.config.get("max_config_bytes", 0)),
+            max_objects=int(self.model.config.get("max_traefik_objects", 0)),
+        )
+
+    def _plan_config(self, direct_redirects: dict[str, str], shard: str = "") -> "LayoutPlan":
+        """Render a shard with the configured layout, or the cheapest one that fits."""
+        from layout_planner import LAYOUT_AUTO, layout_candidates, plan_layout
 
-        for from_path, to_path in direct_redirects.items():
-            self._add_redirect_entry(routers, middlewares, index, from_path, to_path)
-            index += 1
+        if self.model.config.get("redirect_layout") != LAYOUT_AUTO:
+            return self._render_published_config(direct_redirects, shard)
 
-        return {"http": {"routers": routers, "middlewares": middlewares}}
+        candidates = layout_candidates(
+            self.model.config, bool(self.model.config.get("auto_layout_https_only"))
+        )
+        return plan_layout(
+            functools.partial(self._render_candidate, direct_redirects), candidates, self._budget
+        )
+
+    def _render_candidate(
+        self, direct_redirects: dict[str, str], options: Mapping[str, object]
+    ) -> "LayoutPlan":
+        from layout_planner import LayoutPlan
+        from redirect_render import RedirectRenderer
+        from render_cache import encoded_length
+
+        # Candidates differ in their entrypoints, which the per-entry render cache
+        # is keyed on, so they are rendered whole.
+        renderer = RedirectRenderer(
+            self.app.name, {**self.model.config, **options}, self._prefix_redirects[0]
+        )
+
+        config = renderer.build_config(direct_redirects)
+        text = json.dumps(config, separators=(",", ":"))
+        routers = config["http"]["routers"]
+        return LayoutPlan(
+            options,
+            text,
+            encoded_length(text),
+            len(routers),
+            len(config["http"]["middlewares"]),
+            max((len(router["middlewares"]) for router in routers.values()), default=0),
+        )
 
-    def _add_redirect_entry(
+    def _config_fingerprint(self, direct_redirects: dict[str, str], relation: ops.Relation) -> str:
+        """Hash every input that determines the published Traefik config.
+
+        Hashing the inputs rather than the rendered output lets an unchanged map
+        skip rendering as well as the relation write.
+        """
+        if relation.id in self._fingerprints:
+            return self._fingerprints[relation.id]
+        settings = json.dumps(
+            {
+                "app": self.app.name,
+                "relation": relation.id,
+                "options": {
+                    option: value
+                    for option, value in self.model.config.items()
+                    if option != "direct_path_redirects"
+                },
+            },
+            separators=(",", ":"),
+        )
+        digest = hashlib.sha256(settings.encode())
+        # Fed entry by entry rather than serialized, which would copy the whole map.
+        for source, target in direct_redirects.items():
+            digest.update(f"\n{source}\0{target}".encode())
+        self._fingerprints[relation.id] = digest.hexdigest()
+        return self._fingerprints[relation.id]
+
+    def _load_redirects(
         self,
-        routers: dict[str, dict],
-        middlewares: dict[str, dict],
-        index: int,
-        from_path: str,
-        to_path: str,
-    ) -> None:
-        base_name = f"{self.app.name}-path-redirect-{index}"
-        router_name = base_name
-        tls_router_name = f"{base_name}-tls"
-        middleware_name = f"{base_name}-middleware"
-        rule_type = "Path"
-
-        escaped_from = re.escape(from_path)
-        redirect_regex = rf"^(https?://[^/]+){escaped_from}$"
-        replacement = to_path if self._is_absolute_url(to_path) else f"${{1}}{to_path}"
-
-        routers[router_name] = {
-            "rule": f"{rule_type}(`{from_path}`)",
-            "service": "noop@internal",
-            "middlewares": [middleware_name],
-        }
-        routers[tls_router_name] = {
-            "rule": f"{rule_type}(`{from_path}`)",
-            "service": "noop@internal",
-            "middlewares": [middleware_name],
-            "tls": {},
-        }
-        middlewares[middleware_name] = {
-            "redirectRegex": {
-                "regex": redirect_regex,
-                "replacement": replacement,
-                "permanent": True,
-            }
-        }
+    ) -> tuple[tuple[dict[str, str], dict[str, str], dict[str, str]], Optional[str]]:
+        """Parse the redirect-map resource and the direct and prefix redirect options.
 
-    @staticmethod
-    def _parse_redirect_map(value: object, name: str) -> tuple[dict[str, str], Optional[str]]:
-        if value is None:
-            return {}, None
+        Entries whose key is not a path are recorded in the validation report rather
+        than failing the parse, so that one pass reports every invalid entry.
+        """
+        from redirect_maps import parse_redirect_map
 
-        if isinstance(value, dict):
-            data = value
-        else:
-            raw_value = str(value).strip()
-            if not raw_value:
-                return {}, None
-            try:
-                data = yaml.safe_load(raw_value)
-            except yaml.YAMLError as exc:
-                return {}, f"{name} must be a map: {exc}"
-
-        if data is None:
+        resource_redirects, error = self._read_redirect_resource()
+        if error:
+            return ({}, {}, {}), error
+        direct_redirects, error = parse_redirect_map(
+            self.model.config["direct_path_redirects"], "direct_path_redirects", self._validation
+        )
+        if error:
+            return ({}, {}, {}), error
+        prefix_redirects, error = self._prefix_redirects
+        if error:
+            return ({}, {}, {}), error
+        return (resource_redirects, direct_redirects, prefix_redirects), None
+
+    def _merge_redirects(
+        self,
+        resource_redirects: dict[str, str],
+        direct_redirects: dict[str, str],
+        prefix_redirects: dict[str, str],
+    ) -> tuple[dict[str, str], Optional[str]]:
+        from redirect_maps import merge_redirect_maps
+
+        report = self._validation
+        merged = merge_redirect_maps(
+            report,
+            resource_redirects,
+            f"{REDIRECT_MAP_RESOURCE} resource",
+            direct_redirects,
+            "direct_path_redirects",
+            prefix_redirects,
+            "prefix_path_redirects",
+        )
+        if merged is None:
+            hint = (
+                "; run the validate-redirects action for all of them" if report.count > 1 else ""
+            )
+            return {}, f"{report.summary()}{hint}"
+        return merged, None
+
+    @functools.cached_property
+    def _validation(self) -> "ValidationReport":
+        from redirect_validation import ValidationReport
+
+        return ValidationReport()
+
+    @functools.cached_property
+    def _prefix_redirects(self) -> tuple[dict[str, str], Optional[str]]:
+        from redirect_maps import parse_redirect_map
+
+        return parse_redirect_map(
+            self.model.config.get("prefix_path_redirects"),
+            "prefix_path_redirects",
+            self._validation,
+        )
+
+    def _read_redirect_resource(self) -> tuple[dict[str, str], Optional[str]]:
+        try:
+            path = self.model.resources.fetch(REDIRECT_MAP_RESOURCE)
+        except ops.ModelError:
             return {}, None
-        if not isinstance(data, dict):
-            return {}, f"{name} must be a map"
-
-        result: dict[str, str] = {}
-        for key, val in data.items():
-            cleaned_key = str(key).strip()
-            cleaned_value = str(val).strip()
-            result[cleaned_key] = cleaned_value
-        return result, None
-
-    @staticmethod
-    def _is_absolute_url(value: str) -> bool:
-        return value.startswith("http://") or value.startswith("https://")
+        from redirect_maps import parse_redirect_file
+
+        return parse_redirect_file(path, f"{REDIRECT_MAP_RESOURCE} resource", self._validation)
+
+    @functools.cached_property
+    def _renderer(self) -> "RedirectRenderer":
+        from redirect_render import RedirectRenderer
+
+        return RedirectRenderer(self.app.name, self.model.config, self._prefix_redirects[0])
+
+    def _build_traefik_config(self, direct_redirects: dict[str, str]) -> dict:
+        return self._renderer.build_config(direct_redirects)
+
+    def _render_published_config(
+        self, direct_redirects: dict[str, str], shard: str = ""
+    ) -> "LayoutPlan":
+        """Render the compact JSON config published to Traefik.
+
+        The per-entry layout is spliced from the entries' serialized fragments,
+        which are taken from the shard's render cache when an entry is unchanged
+        since the previous render. The other layouts share objects between
+        entries and are rendered whole.
+        """
+        from layout_planner import PLANNED_OPTIONS, LayoutPlan
+        from render_cache import encoded_length, serialize_members, splice_config
+
+        renderer = self._renderer
+        options = {option: self.model.config.get(option) for option in PLANNED_OPTIONS}
+        if renderer.shares_objects:
+            return self._render_candidate(direct_redirects, options)
+
+        direct_redirects, redirects, groups, priorities = renderer.prepare_redirects(
+            direct_redirects
+        )
+        router_members, middleware_members = self._per_entry_members(redirects, priorities, shard)
+        routers: dict[str, dict] = {}
+        middlewares: dict[str, dict] = {}
+        renderer.add_compressed_groups(routers, middlewares, groups, priorities)
+        router_members.append(serialize_members(routers))
+        middleware_members.append(serialize_members(middlewares))
+
+        router_count = renderer.routers_per_rule * len(redirects) + len(routers)
+        middleware_count = len(redirects) + len(middlewares)
+        renderer.log_compression(
+            direct_redirects,
+            redirects,
+            groups,
+            router_count + middleware_count,
+        )
+        config = splice_config(router_members, middleware_members)
+        return LayoutPlan(
+            options,
+            config,
+            encoded_length(config),
+            router_count,
+            middleware_count,
+            1 if router_count else 0,
+        )
+
+    def _per_entry_members(
+        self, redirects: dict[str, str], priorities: dict[str, int], shard: str
+    ) -> tuple[list[str], list[str]]:
+        """Return the serialized router and middleware members of every entry."""
+        from render_cache import serialize_members
+
+        cache = self._get_render_cache()
+        suffixes = self._renderer.name_suffixes(redirects)
+        prefix_sources = self._renderer.prefix_sources
+        reused, rendered = cache.reused, cache.rendered
+        router_members, middleware_members = [], []
+        for from_path, to_path in redirects.items():
+            priority = priorities.get(from_path)
+            key = cache.key(
+                suffixes[from_path],
+                from_path,
+                to_path,
+                priority,
+                from_path in prefix_sources,
+            )
+            fragment = cache.get(key, shard)
+            if fragment is None:
+                routers: dict[str, dict] = {}
+                middlewares: dict[str, dict] = {}
+                self._renderer.add_redirect_entry(
+                    routers, middlewares, suffixes[from_path], from_path, to_path, priority
+                )
+                fragment = (serialize_members(routers), serialize_members(middlewares))
+                cache.put(key, fragment, shard)
+            router_members.append(fragment[0])
+            middleware_members.append(fragment[1])
+        logger.info(
+            "rendered %d redirects, reused %d from the previous render",
+            cache.rendered - rendered,
+            cache.reused - reused,
+        )
+        return router_members, middleware_members
+
+    def _get_render_cache(self) -> "RenderCache":
+        from render_cache import RenderCache
+
+        if not self._render_cache:
+            # Object names embed the app name and every router carries the entrypoint
+            # mode, so a change to either invalidates all fragments at once.
+            signature = f"{self.app.name}:{self._renderer.entrypoints}"
+            self._render_cache = RenderCache(self.charm_dir / RENDER_CACHE_FILE, signature)
+        return self._render_cache
 
 
 if __name__ == "__main__":  # pragma: nocover
@@ -0,0 +1,153 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+"""Pick the cheapest Traefik layout of a redirect map that fits a size budget.
+
+Every layout renders the same redirects, but they trade payload for per-request
+work. Per-entry objects grow with the map and shared middlewares with the
+distinct targets, with one middleware per router either way. The compact layout
+has a single router pair, but it chains one redirectRegex middleware per
+distinct target, and Traefik runs the chain in turn on every request it routes.
+The planner renders each candidate and measures its serialized size, object
+count and longest middleware chain. It keeps the shortest chain within the
+budget, then the smallest config, so the relation databag and Traefik's reloads
+stay bounded without the operator sizing the map by hand, and requests are not
+slowed down to save bytes that fit anyway.
+"""
+
+import logging
+from typing import Callable, Mapping, NamedTuple, Optional
+
+from redirect_render import ENTRYPOINTS_ALL, ENTRYPOINTS_HTTPS, REDIRECT_LAYOUTS
+
+logger = logging.getLogger(__name__)
+
+LAYOUT_AUTO = "auto"
+# Options the planner chooses; every other option applies to all candidates.
+PLANNED_OPTIONS = ("redirect_layout", "compress_redirects", "redirect_entrypoints")
+
+
+class LayoutPlan(NamedTuple):
+    """A rendered config and what it costs to publish.
+
+    Attributes:
+        options: Values of PLANNED_OPTIONS the config was rendered with.
+        config: The compact JSON config.
+        config_bytes: Size of the config once encoded.
+        routers: Number of Traefik routers in the config.
+        middlewares: Number of Traefik middlewares in the config.
+        chain: Most middlewares chained on one router, which a request routed
+            by it may run through.
+    """
+
+    options: Mapping[str, object]
+    config: str
+    config_bytes: int
+    routers: int
+    middlewares: int
+    chain: int
+
+    @property
+    def objects(self) -> int:
+        """Number of Traefik objects in the config."""
+        return self.routers + self.middlewares
+
+    @property
+    def name(self) -> str:
+        """Readable summary of the planned options."""
+        parts = [str(self.options["redirect_layout"])]
+        if self.options.get("compress_redirects"):
+            parts.append("compressed")
+        if self.options.get("redirect_entrypoints") == ENTRYPOINTS_HTTPS:
+            parts.append("https only")
+        return ", ".join(parts)
+
+
+class Budget(NamedTuple):
+    """Limits on a published config; 0 leaves a limit unset."""
+
+    max_bytes: int = 0
+    max_objects: int = 0
+
+    def admits(self, plan: LayoutPlan) -> bool:
+        """Whether the plan stays within both limits."""
+        return (not self.max_bytes or plan.config_bytes <= self.max_bytes) and (
+            not self.max_objects or plan.objects <= self.max_objects
+        )
+
+    def describe_excess(self, plan: LayoutPlan) -> str:
+        """Explain how a plan exceeds the budget, with the numbers."""
+        limits = []
+        if self.max_bytes:
+            limits.append(f"{self.max_bytes / 1024:.1f} KiB")
+        if self.max_objects:
+            limits.append(f"{self.max_objects} objects")
+        return (
+            f"{plan.name} renders {plan.config_bytes / 1024:.1f} KiB and {plan.objects} "
+            f"objects, over the budget of {' and '.join(limits)}"
+        )
+
+
+def layout_candidates(options: Mapping[str, object], allow_https_only: bool) -> list[dict]:
+    """List the option sets the planner may render a map with.
+
+    Every layout is tried with and without compression, which never changes
+    where a request is redirected. Compression the operator enabled stays
+    enabled. Dropping the plain HTTP routers changes what http:// requests get,
+    so it is only tried when the operator allowed it.
+    """
+    entrypoints = options.get("redirect_entrypoints", ENTRYPOINTS_ALL)
+    entrypoint_choices = [entrypoints]
+    if allow_https_only and entrypoints == ENTRYPOINTS_ALL:
+        entrypoint_choices.append(ENTRYPOINTS_HTTPS)
+    compress_choices = [True] if options.get("compress_redirects") else [False, True]
+    return [
+        {"redirect_layout": layout, "compress_redirects": compress, "redirect_entrypoints": choice}
+        for choice in entrypoint_choices
+        for compress in compress_choices
+        for layout in REDIRECT_LAYOUTS
+    ]
+
+
+def plan_layout(
+    render: Callable[[dict], LayoutPlan], candidates: list[dict], budget: Budget
+) -> LayoutPlan:
+    """Render every candidate and return the cheapest plan within the budget.
+
+    Plans within the budget are ranked by middleware chain, then size, then
+    object count. When none fits, the smallest plan overall is returned, so the
+    caller can report how far off it is.
+    """
+    best: Optional[LayoutPlan] = None
+    best_fits = False
+    for options in candidates:
+        plan = render(options)
+        fits = budget.admits(plan)
+        logger.debug(
+            "layout %s: %d bytes, %d objects, %d chained middlewares%s",
+            plan.name,
+            plan.config_bytes,
+            plan.objects,
+            plan.chain,
+            "" if fits else ", over budget",
+        )
+        if (fits and not best_fits) or (fits == best_fits and _cheaper(plan, best, fits)):
+            best, best_fits = plan, fits
+    if best is None:
+        raise ValueError("no layout candidates to plan with")
+    logger.info(
+        "picked layout %s for %d bytes, %d objects, %d chained middlewares",
+        best.name,
+        best.config_bytes,
+        best.objects,
+        best.chain,
+    )
+    return best
+
+
+def _cheaper(plan: LayoutPlan, best: Optional[LayoutPlan], fits: bool) -> bool:
+    if best is None:
+        return True
+    if fits and plan.chain != best.chain:
+        return plan.chain < best.chain
+    return (plan.config_bytes, plan.objects) < (best.config_bytes, best.objects)
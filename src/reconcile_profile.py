@@ -0,0 +1,57 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+"""Per-stage timings and sizes of a reconcile.
+
+Stages are timed with a monotonic clock and accumulate, so a stage entered
+once per relation (rendering, publishing) reports its total for the reconcile.
+"""
+
+import contextlib
+import time
+from typing import Iterator
+
+STAGES = ("parse", "validate", "render", "publish")
+
+
+class ReconcileProfile:
+    """Timings and sizes gathered during one reconcile."""
+
+    def __init__(self, event: str):
+        self.event = event
+        self.timestamp = int(time.time())
+        self.stages_ms: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+        self._start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as part of the named stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.stages_ms[name] = self.stages_ms.get(name, 0.0) + elapsed
+
+    def add(self, name: str, value: int) -> None:
+        """Add value to the named count."""
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    @property
+    def total_ms(self) -> float:
+        """Time since the reconcile started."""
+        return (time.perf_counter() - self._start) * 1000
+
+    def as_dict(self, status: str) -> dict:
+        """Return the profile as plain data, fit for StoredState and action results."""
+        return {
+            "event": self.event,
+            "timestamp": self.timestamp,
+            "status": status,
+            **self.counts,
+            "ms": {
+                **{stage: round(self.stages_ms.get(stage, 0.0), 1) for stage in STAGES},
+                "total": round(self.total_ms, 1),
+            },
+        }
@@ -0,0 +1,290 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+"""Static analysis of a redirect map: duplicates, shadowing, chains and cycles.
+
+Also holds the chain-flattening pass, which builds on the same graph walk.
+
+Every check runs over a sorted index of source paths or a single walk of the
+redirect graph, so a 100k-entry map is analysed in near-linear time.
+"""
+
+import bisect
+import re
+from typing import Collection, NamedTuple, Optional
+
+from redirect_sources import (
+    is_absolute_url,
+    join_source,
+    next_hop,
+    router_rule,
+    scoped_paths,
+    split_source,
+)
+
+_REPEATED_SLASHES = re.compile(r"/{2,}")
+
+# A point of a redirect walk: the host the request was sent to, empty when it
+# may be any host, and the source it matched.
+_State = tuple[str, str]
+
+
+class AnalysisReport(NamedTuple):
+    """Findings about a redirect map.
+
+    Attributes:
+        duplicates: Groups of sources that only differ before normalization.
+        shadowed: (prefix source, covered source) pairs where the prefix router
+            outranks the covered source's, so requests for it are sent to the
+            prefix target instead.
+        chains: (first source, redirects followed, final target) of redirect chains
+            of two or more hops.
+        cycles: Redirect loops, listed from their smallest source.
+    """
+
+    duplicates: list[list[str]]
+    shadowed: list[tuple[str, str]]
+    chains: list[tuple[str, int, str]]
+    cycles: list[list[str]]
+
+    def as_dict(self) -> dict[str, list]:
+        """Return the findings keyed by name."""
+        return self._asdict()
+
+
+def normalize_path(path: str) -> str:
+    """Collapse repeated slashes and drop the trailing slash of a path."""
+    normalized = _REPEATED_SLASHES.sub("/", path)
+    if len(normalized) > 1:
+        normalized = normalized.rstrip("/")
+    return normalized or "/"
+
+
+def analyze_redirects(
+    redirects: dict[str, str], prefix_sources: Collection[str] = (), ranked: bool = False
+) -> AnalysisReport:
+    """Analyse a redirect map.
+
+    Args:
+        redirects: Map of source path to target path or URL.
+        prefix_sources: Sources that match their whole subtree instead of one path.
+        ranked: Whether routers get explicit priorities from router_priority_base
+            rather than Traefik's default rule-length ordering.
+    """
+    cycles = find_cycles(redirects)
+    return AnalysisReport(
+        duplicates=find_duplicates(redirects),
+        shadowed=find_shadowed(redirects, prefix_sources, ranked),
+        chains=find_chains(redirects, cycles),
+        cycles=cycles,
+    )
+
+
+def find_duplicates(redirects: dict[str, str]) -> list[list[str]]:
+    """Group sources that normalize to the same host and path."""
+    by_normalized: dict[str, list[str]] = {}
+    for source in redirects:
+        host, path = split_source(source)
+        by_normalized.setdefault(join_source(host, normalize_path(path)), []).append(source)
+    return [sorted(sources) for sources in by_normalized.values() if len(sources) > 1]
+
+
+def find_shadowed(
+    sources: Collection[str], prefix_sources: Collection[str], ranked: bool = False
+) -> list[tuple[str, str]]:
+    """Find sources that a prefix source covers and outranks.
+
+    Sources below a prefix have a longer path, which wins when routers are
+    ranked. Under Traefik's default rule-length ordering they lose to a prefix
+    whose rule is at least as long, typically a host-scoped prefix covering
+    unscoped sources. Ranks are those the renderer gives routers of their own;
+    the combined rules of the compact layout and of compression are not
+    modelled.
+
+    Sources are indexed by path, and every path under ``base`` sorts between
+    ``base/`` and ``base0``, so each prefix costs a few binary searches plus
+    the sources it covers.
+    """
+    prefix_sources = set(prefix_sources)
+    by_path = sorted((split_source(source)[1], source) for source in sources)
+    paths = [path for path, _ in by_path]
+    shadowed = []
+    for prefix in sorted(prefix_sources):
+        host, path = split_source(prefix)
+        base = path.rstrip("/")
+        covered = by_path
+        if base:
+            equal = slice(bisect.bisect_left(paths, base), bisect.bisect_right(paths, base))
+            below = slice(
+                bisect.bisect_left(paths, f"{base}/"), bisect.bisect_left(paths, f"{base}0")
+            )
+            covered = by_path[equal] + by_path[below]
+        rank = _router_rank(prefix, prefix_sources, ranked)
+        for _, source in covered:
+            source_host = split_source(source)[0]
+            if source == prefix or (host and source_host and source_host != host):
+                continue
+            if _router_rank(source, prefix_sources, ranked) <= rank:
+                shadowed.append((prefix, source))
+    return shadowed
+
+
+def _router_rank(source: str, prefix_sources: Collection[str], ranked: bool) -> tuple[int, ...]:
+    host, path = split_source(source)
+    is_prefix = source in prefix_sources
+    if ranked:
+        # The order of the specificities RedirectRenderer ranks routers by.
+        return (len(path.rstrip("/")), bool(host), not is_prefix)
+    if is_prefix:
+        # Prefix routers are ranked as the exact rule of their own path.
+        source = join_source(host, path.rstrip("/") or "/")
+    return (len(router_rule(source)),)
+
+
+def find_chains(redirects: dict[str, str], cycles: list[list[str]]) -> list[tuple[str, int, str]]:
+    """Find sources whose target is itself redirected.
+
+    Only chains that are not the tail of a longer chain are reported, as their
+    first source, the number of redirects a client follows and where it ends.
+    A chain running into one of ``cycles`` ends at the first looping source.
+    """
+    walker = _ChainWalker(redirects, {source for cycle in cycles for source in cycle})
+    targeted = set()
+    for source in redirects:
+        landed = walker.hop(_start(source))
+        if landed is not None:
+            targeted.add(landed[1])
+    chains = []
+    for source in redirects:
+        if source in targeted or source in walker.cyclic or walker.hop(_start(source)) is None:
+            continue
+        length, final = walker.tail(_start(source))
+        chains.append((source, length, final))
+    return chains
+
+
+class _ChainWalker:
+    """Walks redirect chains, memoizing each walk state's next state and tail.
+
+    Chains sharing a tail only walk it once, so finding every chain is linear
+    in the size of the map however the chains overlap.
+    """
+
+    def __init__(self, redirects: dict[str, str], cyclic: set[str]):
+        self.redirects = redirects
+        self.cyclic = cyclic
+        self._host_paths = scoped_paths(redirects)
+        self._hops: dict[_State, Optional[_State]] = {}
+        self._tails: dict[_State, tuple[int, str]] = {}
+
+    def hop(self, state: _State) -> Optional[_State]:
+        """Return the state a client is redirected to, if it matches a source."""
+        if state not in self._hops:
+            target = self.redirects[state[1]]
+            self._hops[state] = next_hop(state[0], target, self.redirects, self._host_paths)
+        return self._hops[state]
+
+    def tail(self, state: _State) -> tuple[int, str]:
+        """Return how many redirects follow from a state, and where they end."""
+        walk = []
+        node: Optional[_State] = state
+        while node is not None and node not in self._tails:
+            walk.append(node)
+            node = self.hop(node)
+            if node is not None and node[1] in self.cyclic:
+                self._tails[walk.pop()] = (1, node[1])
+                break
+        for visited in reversed(walk):
+            landed = self.hop(visited)
+            if landed is None:
+                self._tails[visited] = (1, self.redirects[visited[1]])
+            else:
+                length, final = self._tails[landed]
+                self._tails[visited] = (length + 1, final)
+        return self._tails[state]
+
+
+def find_cycles(redirects: dict[str, str]) -> list[list[str]]:
+    """Find redirect loops such as ``/a`` -> ``/b`` -> ``/a``.
+
+    Each walk state (request host, source) has a single next state, so walking
+    from every unvisited source finds each cycle once in linear time.
+    """
+    host_paths = scoped_paths(redirects)
+    visited: set[_State] = set()
+    cycles = []
+    found: set[tuple[str, ...]] = set()
+    for start in redirects:
+        walk: dict[_State, int] = {}
+        node: Optional[_State] = _start(start)
+        while node is not None and node not in visited and node not in walk:
+            walk[node] = len(walk)
+            node = next_hop(node[0], redirects[node[1]], redirects, host_paths)
+        if node is not None and node in walk:
+            cycle = [source for _, source in list(walk)[walk[node] :]]
+            pivot = cycle.index(min(cycle))
+            cycle = cycle[pivot:] + cycle[:pivot]
+            # The same sources can loop on more than one host.
+            if tuple(cycle) not in found:
+                found.add(tuple(cycle))
+                cycles.append(cycle)
+        visited.update(walk)
+    return cycles
+
+
+def flatten_chains(
+    redirects: dict[str, str],
+) -> tuple[dict[str, str], list[tuple[str, str, str]]]:
+    """Point every source straight at the end of its redirect chain.
+
+    Resolved targets are memoized per walk state, so every source is walked
+    once however long or shared the chains are. Chains running into a cycle
+    stop at its first looping source, and sources on a cycle keep their
+    original target. Only relative hops are followed: a relative target after
+    an absolute one is relative to another host and cannot be copied onto the
+    first source. Unscoped sources are not flattened through a path that also
+    has host-scoped sources, as where they end depends on the request's host.
+
+    Returns:
+        The flattened map, in the original order, and a (source, original target,
+        final target) entry for each rewritten source.
+    """
+    host_paths = scoped_paths(redirects)
+    final: dict[_State, str] = {}
+    cyclic: set[_State] = set()
+    for start in redirects:
+        walk: dict[_State, int] = {}
+        node: Optional[_State] = _start(start)
+        last = node
+        while node is not None and node not in final and node not in walk:
+            walk[node] = len(walk)
+            last = node
+            target = redirects[node[1]]
+            node = (
+                None
+                if is_absolute_url(target)
+                else next_hop(node[0], target, redirects, host_paths)
+            )
+        if node is not None and node in walk:
+            cyclic.update(list(walk)[walk[node] :])
+            for state in walk:
+                final[state] = redirects[state[1]]
+            continue
+        if node is None or node in cyclic:
+            resolved = redirects[last[1]]
+        else:
+            resolved = final[node]
+        for state in walk:
+            final[state] = resolved
+
+    flattened = {source: final[_start(source)] for source in redirects}
+    rewritten = [
+        (source, target, flattened[source])
+        for source, target in redirects.items()
+        if flattened[source] != target
+    ]
+    return flattened, rewritten
+
+
+def _start(source: str) -> _State:
+    return split_source(source)[0], source
@@ -0,0 +1,263 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+"""Load redirect maps and check them before they are rendered.
+
+Maps come from the charm options as JSON or YAML strings, and from files (the
+redirect-map resource, or the render CLI's arguments) as JSON, YAML or
+two-column CSV. Both the charm and the render CLI load and check maps through
+this module, so a map the CLI accepts is one the charm publishes.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Mapping, Optional, TextIO
+
+import yaml
+
+from layout_planner import LAYOUT_AUTO
+from redirect_render import (
+    LAYOUT_COMPACT,
+    REDIRECT_ENTRYPOINTS,
+    REDIRECT_LAYOUTS,
+    ROUTER_NAMINGS,
+    int_option,
+)
+from redirect_sources import join_source, split_source
+from redirect_validation import ValidationReport
+from sharding import SHARD_STRATEGIES
+
+if TYPE_CHECKING:
+    from redirect_analysis import AnalysisReport
+
+logger = logging.getLogger(__name__)
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
+
+# Options restricted to a fixed set of values; the first value is the default.
+CHOICE_OPTIONS = {
+    "redirect_layout": (*REDIRECT_LAYOUTS, LAYOUT_AUTO),
+    "router_naming": ROUTER_NAMINGS,
+    "redirect_entrypoints": REDIRECT_ENTRYPOINTS,
+    "shard_by": SHARD_STRATEGIES,
+}
+NON_NEGATIVE_OPTIONS = ("router_priority_base", "max_config_bytes", "max_traefik_objects")
+# The compact router chains one middleware per distinct target and every request
+# it routes runs through them in turn. Longer chains are only worth it when most
+# sources share their target with others.
+COMPACT_CHAIN_WARNING = 10
+
+
+def parse_redirect_map(
+    value: object, name: str, report: ValidationReport
+) -> tuple[dict[str, str], Optional[str]]:
+    """Parse a redirect map given as a dict or a JSON or YAML string.
+
+    Returns the map and an error when the value is not a map at all. Entries whose
+    key is not a path are recorded in the report and left out of the map, so that
+    one pass reports every invalid entry.
+    """
+    if value is None:
+        return {}, None
+
+    if isinstance(value, dict):
+        data = value
+    else:
+        raw_value = str(value).strip()
+        if not raw_value:
+            return {}, None
+        data = _load_json(raw_value)
+        if data is None:
+            try:
+                data = yaml.load(raw_value, Loader=_SafeLoader)
+            except yaml.YAMLError as exc:
+                return {}, f"{name} must be a map: {exc}"
+
+    if data is None:
+        return {}, None
+    if not isinstance(data, dict):
+        return {}, f"{name} must be a map"
+    return _clean_redirect_entries(data, name, report)
+
+
+def parse_redirect_file(
+    path: Path, name: str, report: ValidationReport
+) -> tuple[dict[str, str], Optional[str]]:
+    """Parse a redirect map file in JSON, YAML or two-column CSV.
+
+    The format is sniffed from the first line that is not blank or a comment:
+    JSON objects open with ``{`` and a double-quoted key, YAML documents with
+    ``---``, a ``%`` directive, or a ``key:`` line, and anything else is read as
+    CSV (``source,target``). YAML is parsed from the open file and CSV one row
+    at a time; JSON is read whole by the json module, which is still much
+    faster than parsing it as YAML.
+    """
+    try:
+        with open(path, encoding="utf-8", newline="") as handle:
+            return _read_redirect_file(handle, name, report)
+    except UnicodeDecodeError as exc:
+        return {}, f"{name} must be UTF-8 text: {exc.reason} at byte {exc.start}"
+
+
+def merge_redirect_maps(
+    report: ValidationReport,
+    resource_redirects: dict[str, str],
+    resource_name: str,
+    direct_redirects: dict[str, str],
+    direct_name: str,
+    prefix_redirects: dict[str, str],
+    prefix_name: str,
+) -> Optional[dict[str, str]]:
+    """Check every entry of the maps and merge them, or return None if any is invalid.
+
+    Direct and prefix redirects win over resource entries with the same source,
+    but a source may not be both a direct and a prefix redirect. The merged map
+    reuses one of the given dicts rather than copying all of them.
+    """
+    report.check(resource_redirects, resource_name)
+    report.check(direct_redirects, direct_name)
+    report.check(prefix_redirects, prefix_name, prefix=True)
+    report.check_overlap(prefix_redirects, prefix_name, direct_redirects, direct_name)
+    if report.count:
+        return None
+
+    direct_redirects.update(prefix_redirects)
+    if not resource_redirects:
+        return direct_redirects
+    resource_redirects.update(direct_redirects)
+    return resource_redirects
+
+
+def validate_options(options: Mapping[str, object]) -> Optional[str]:
+    """Check the options that shape the rendered config."""
+    for option, choices in CHOICE_OPTIONS.items():
+        if options.get(option, choices[0]) not in choices:
+            return f"{option} must be one of: {', '.join(choices)}"
+    for option in NON_NEGATIVE_OPTIONS:
+        if int_option(options, option) < 0:
+            return f"{option} must not be negative"
+    return None
+
+
+def check_redirects(
+    redirects: dict[str, str], options: Mapping[str, object], analysis: "AnalysisReport"
+) -> Optional[str]:
+    """Check a merged map and the options it is rendered with, before rendering."""
+    if not redirects:
+        return "at least one redirect must be configured"
+    error = validate_options(options)
+    if error:
+        return error
+    if analysis.cycles:
+        cycle = analysis.cycles[0]
+        return f"redirect cycle: {' -> '.join(cycle + cycle[:1])}"
+    if options.get("redirect_layout") == LAYOUT_COMPACT:
+        _warn_long_compact_chain(redirects)
+    return None
+
+
+def _warn_long_compact_chain(redirects: dict[str, str]) -> None:
+    targets = len({(split_source(source)[0], target) for source, target in redirects.items()})
+    if targets > COMPACT_CHAIN_WARNING and targets * 2 > len(redirects):
+        logger.warning(
+            "compact layout chains %d redirectRegex middlewares for %d redirects, which "
+            "every request runs through; use shared-middleware or auto for maps with "
+            "mostly distinct targets",
+            targets,
+            len(redirects),
+        )
+
+
+def _clean_redirect_entries(
+    data: dict, name: str, report: ValidationReport
+) -> tuple[dict[str, str], Optional[str]]:
+    result: dict[str, str] = {}
+    for key, val in data.items():
+        cleaned_key = str(key).strip()
+        if isinstance(val, dict):
+            error = _add_host_redirects(result, cleaned_key, val, name, report)
+            if error:
+                return {}, error
+            continue
+        cleaned_value = str(val).strip()
+        # Flat keys other than paths would read as host-scoped sources.
+        if cleaned_key and not cleaned_key.startswith("/"):
+            report.add(name, cleaned_key, cleaned_value, "keys must start with '/'")
+            continue
+        result[cleaned_key] = cleaned_value
+    return result, None
+
+
+def _add_host_redirects(
+    result: dict[str, str], host: str, redirects: dict, name: str, report: ValidationReport
+) -> Optional[str]:
+    """Add a ``{host: {path: target}}`` block as host-scoped source keys."""
+    host = host.lower()
+    if host.startswith("/"):
+        return f"{name} values must be strings, not maps, for path keys"
+    for key, val in redirects.items():
+        path = str(key).strip()
+        if not path.startswith("/"):
+            report.add(name, path, str(val).strip(), f"keys under {host} must start with '/'")
+            continue
+        result[join_source(host, path)] = str(val).strip()
+    return None
+
+
+def _read_redirect_file(
+    handle: TextIO, name: str, report: ValidationReport
+) -> tuple[dict[str, str], Optional[str]]:
+    first_line = ""
+    for line in handle:
+        first_line = line.strip()
+        if first_line and not first_line.startswith("#"):
+            break
+    handle.seek(0)
+
+    if not first_line:
+        return {}, None
+    is_yaml = first_line.startswith(("---", "%")) or first_line.endswith(":")
+    if first_line.startswith("{") or is_yaml or ": " in first_line:
+        return _read_mapping(handle, first_line, name, report)
+
+    import csv
+
+    result: dict[str, str] = {}
+    for row in csv.reader(handle):
+        if not row or not row[0].strip() or row[0].lstrip().startswith("#"):
+            continue
+        if len(row) != 2:
+            return {}, f"{name} line must have two columns: {','.join(row)}"
+        if not row[0].strip().startswith("/"):
+            report.add(name, row[0].strip(), row[1].strip(), "keys must start with '/'")
+            continue
+        result[row[0].strip()] = row[1].strip()
+    return result, None
+
+
+def _read_mapping(
+    handle: TextIO, first_line: str, name: str, report: ValidationReport
+) -> tuple[dict[str, str], Optional[str]]:
+    # JSON keys are double-quoted; a flow mapping with other keys is YAML, so
+    # each file is parsed by one parser only.
+    is_json = first_line.startswith("{") and first_line[1:].lstrip()[:1] in ("", '"', "}")
+    try:
+        data = json.load(handle) if is_json else yaml.load(handle, Loader=_SafeLoader)
+    except (ValueError, yaml.YAMLError) as exc:
+        return {}, f"{name} must be a map: {exc}"
+    return parse_redirect_map(data, name, report)
+
+
+def _load_json(raw_value: str) -> Optional[dict]:
+    # The documented format is JSON; json is much faster than YAML for large maps.
+    if not raw_value.startswith("{"):
+        return None
+    try:
+        data = json.loads(raw_value)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
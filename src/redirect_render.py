@@ -0,0 +1,581 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+"""Render a redirect map into Traefik dynamic configuration.
+
+Every redirect becomes routers matching its source and a redirectRegex
+middleware rewriting the request URL to its target. Prefix redirects match
+their source and every path below it, and carry the rest of the path and the
+query string over to the target. The layout, naming,
+entrypoint, compression, chain flattening and priority options decide how
+those objects are shaped and shared.
+
+Rendering only depends on the map and the options, so the charm and the
+standalone render CLI produce the same config.
+"""
+
+import hashlib
+import json
+import logging
+import re
+from typing import TYPE_CHECKING, Collection, Iterable, Iterator, Mapping, Optional
+
+from redirect_sources import (
+    combined_rule,
+    is_absolute_url,
+    join_source,
+    origin_pattern,
+    prefix_rule,
+    router_rule,
+    split_source,
+)
+from render_cache import serialize_members
+
+if TYPE_CHECKING:
+    from rule_compression import RedirectGroup
+
+logger = logging.getLogger(__name__)
+
+LAYOUT_PER_ENTRY = "per-entry"
+LAYOUT_COMPACT = "compact"
+LAYOUT_SHARED_MIDDLEWARE = "shared-middleware"
+REDIRECT_LAYOUTS = (LAYOUT_PER_ENTRY, LAYOUT_COMPACT, LAYOUT_SHARED_MIDDLEWARE)
+NAMING_INDEX = "index"
+NAMING_HASH = "hash"
+ROUTER_NAMINGS = (NAMING_INDEX, NAMING_HASH)
+HASH_NAME_LENGTH = 10
+
+ENTRYPOINTS_ALL = "all"
+ENTRYPOINTS_HTTPS = "https"
+ENTRYPOINTS_HTTP = "http"
+REDIRECT_ENTRYPOINTS = (ENTRYPOINTS_ALL, ENTRYPOINTS_HTTPS, ENTRYPOINTS_HTTP)
+# Entrypoint names used by the traefik-k8s charm.
+HTTP_ENTRYPOINT = "web"
+HTTPS_ENTRYPOINT = "websecure"
+
+_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+
+def int_option(options: Mapping[str, object], option: str) -> int:
+    """Read an integer option, which is 0 when unset."""
+    value = options.get(option) or 0
+    return int(value) if isinstance(value, (int, float, str)) else 0
+
+
+class RedirectRenderer:
+    """Render redirect maps with a fixed set of charm options.
+
+    Args:
+        app_name: Prefix of every Traefik object name.
+        options: The charm's config options, or any mapping using the same keys.
+        prefix_sources: Sources that redirect their whole subtree instead of one path.
+    """
+
+    def __init__(
+        self,
+        app_name: str,
+        options: Mapping[str, object],
+        prefix_sources: Collection[str] = (),
+    ):
+        self._app_name = app_name
+        self._options = options
+        self.prefix_sources = frozenset(prefix_sources)
+        self.layout = options.get("redirect_layout", LAYOUT_PER_ENTRY)
+        self.entrypoints = options.get("redirect_entrypoints", ENTRYPOINTS_ALL)
+
+    @property
+    def shares_objects(self) -> bool:
+        """Whether Traefik objects are shared between entries, so none can be rendered alone."""
+        return self.layout in (LAYOUT_COMPACT, LAYOUT_SHARED_MIDDLEWARE)
+
+    @property
+    def routers_per_rule(self) -> int:
+        """Routers rendered for each rule: plain and TLS, or only one of them."""
+        return 2 if self.entrypoints == ENTRYPOINTS_ALL else 1
+
+    def iter_json(self, direct_redirects: dict[str, str]) -> Iterator[str]:
+        """Yield the compact JSON of the config for a redirect map, piece by piece.
+
+        The per-entry layout is serialized one entry at a time, walking the map
+        once for the routers and once for the middlewares, so the rendered
+        document is never held in memory. The layouts sharing objects between
+        entries are rendered whole and then serialized incrementally.
+        """
+        if self.shares_objects:
+            yield from _ENCODER.iterencode(self.build_config(direct_redirects))
+            return
+
+        direct_redirects, redirects, groups, priorities = self.prepare_redirects(direct_redirects)
+        suffixes = self.name_suffixes(redirects)
+        group_routers: dict[str, dict] = {}
+        group_middlewares: dict[str, dict] = {}
+        self.add_compressed_groups(group_routers, group_middlewares, groups, priorities)
+        yield '{"http":{"routers":{'
+        yield from self._iter_entry_members(redirects, suffixes, priorities, 0, group_routers)
+        yield '},"middlewares":{'
+        yield from self._iter_entry_members(redirects, suffixes, priorities, 1, group_middlewares)
+        yield "}}}"
+
+    def _iter_entry_members(
+        self,
+        redirects: dict[str, str],
+        suffixes: dict[str, str],
+        priorities: dict[str, int],
+        kind: int,
+        extra: dict[str, dict],
+    ) -> Iterator[str]:
+        """Yield the serialized routers (kind 0) or middlewares (kind 1) of every entry."""
+        separator = ""
+        for from_path, to_path in redirects.items():
+            objects: tuple[dict[str, dict], dict[str, dict]] = ({}, {})
+            self.add_redirect_entry(
+                *objects, suffixes[from_path], from_path, to_path, priorities.get(from_path)
+            )
+            yield separator + serialize_members(objects[kind])
+            separator = ","
+        if extra:
+            yield separator + serialize_members(extra)
+
+    def build_config(self, direct_redirects: dict[str, str]) -> dict:
+        """Render the Traefik dynamic config for a redirect map."""
+        routers: dict[str, dict] = {}
+        middlewares: dict[str, dict] = {}
+        layout = self.layout
+        direct_redirects, redirects, groups, priorities = self.prepare_redirects(direct_redirects)
+        if layout in (LAYOUT_COMPACT, LAYOUT_SHARED_MIDDLEWARE):
+            redirects, prefix_redirects = self._split_prefix_redirects(redirects)
+            if layout == LAYOUT_COMPACT:
+                self._add_compact_entries(routers, middlewares, redirects, groups, priorities)
+            else:
+                self._add_shared_middleware_entries(routers, middlewares, redirects, priorities)
+                self.add_compressed_groups(routers, middlewares, groups, priorities)
+            # Prefix rules cannot be folded into the exact-path ones, so each keeps
+            # its own router pair and middleware.
+            suffixes = self.name_suffixes(prefix_redirects)
+            for from_path, to_path in prefix_redirects.items():
+                self.add_redirect_entry(
+                    routers,
+                    middlewares,
+                    suffixes[from_path],
+                    from_path,
+                    to_path,
+                    priorities.get(from_path),
+                )
+        else:
+            suffixes = self.name_suffixes(redirects)
+            for from_path, to_path in redirects.items():
+                self.add_redirect_entry(
+                    routers,
+                    middlewares,
+                    suffixes[from_path],
+                    from_path,
+                    to_path,
+                    priorities.get(from_path),
+                )
+            self.add_compressed_groups(routers, middlewares, groups, priorities)
+
+        self.log_compression(direct_redirects, redirects, groups, len(routers) + len(middlewares))
+        return {"http": {"routers": routers, "middlewares": middlewares}}
+
+    def prepare_redirects(
+        self, direct_redirects: dict[str, str]
+    ) -> tuple[dict[str, str], dict[str, str], list["RedirectGroup"], dict[str, int]]:
+        """Apply chain flattening and compression, and rank the sources.
+
+        Returns:
+            The flattened map, the entries left after compression, the compressed
+            groups and the router priorities.
+        """
+        if self._options.get("flatten_redirect_chains"):
+            direct_redirects = self._flatten_chains(direct_redirects)
+
+        redirects, groups = direct_redirects, []
+        if self._options.get("compress_redirects"):
+            from rule_compression import compress_redirects
+
+            exact_redirects, prefix_redirects = self._split_prefix_redirects(direct_redirects)
+            # A group's router ranks as its highest source, which could lift a
+            # source above the prefix router or the host-scoped source that
+            # outranks it on its own.
+            outranked = self.shadowed_sources(exact_redirects)
+            scoped_paths = {path for host, path in map(split_source, exact_redirects) if host}
+            outranked.update(source for source in exact_redirects if source in scoped_paths)
+            own_redirects, exact_redirects = self._split_sources(exact_redirects, outranked)
+            redirects, groups = compress_redirects(exact_redirects)
+            redirects.update(own_redirects)
+            redirects.update(prefix_redirects)
+        return direct_redirects, redirects, groups, self._router_priorities(direct_redirects)
+
+    def _split_prefix_redirects(
+        self, redirects: dict[str, str]
+    ) -> tuple[dict[str, str], dict[str, str]]:
+        """Split a map into its exact-path and its prefix redirects."""
+        if not self.prefix_sources:
+            return redirects, {}
+        exact_redirects, prefix_redirects = {}, {}
+        for from_path, to_path in redirects.items():
+            if from_path in self.prefix_sources:
+                prefix_redirects[from_path] = to_path
+            else:
+                exact_redirects[from_path] = to_path
+        return exact_redirects, prefix_redirects
+
+    def log_compression(
+        self,
+        direct_redirects: dict[str, str],
+        redirects: dict[str, str],
+        groups: list["RedirectGroup"],
+        object_count: int,
+    ) -> None:
+        """Log how many Traefik objects compression saved."""
+        if not groups:
+            return
+        logger.info(
+            "compressed %d redirects into %d rules, saving %d Traefik objects",
+            len(direct_redirects) - len(redirects),
+            len(groups),
+            self.uncompressed_object_count(direct_redirects) - object_count,
+        )
+
+    @staticmethod
+    def _split_sources(
+        redirects: dict[str, str], sources: Collection[str]
+    ) -> tuple[dict[str, str], dict[str, str]]:
+        """Split a map into the entries of the given sources and the rest, in map order."""
+        if not sources:
+            return {}, redirects
+        selected, rest = {}, {}
+        for source, target in redirects.items():
+            (selected if source in sources else rest)[source] = target
+        return selected, rest
+
+    def shadowed_sources(self, redirects: Mapping[str, str]) -> set[str]:
+        """Return the exact sources that a prefix router outranks."""
+        if not self.prefix_sources:
+            return set()
+        from redirect_analysis import find_shadowed
+
+        ranked = int_option(self._options, "router_priority_base") > 0
+        return {source for _, source in find_shadowed(redirects, self.prefix_sources, ranked)}
+
+    def _flatten_chains(self, direct_redirects: dict[str, str]) -> dict[str, str]:
+        from redirect_analysis import flatten_chains
+
+        flattened, rewritten = flatten_chains(direct_redirects)
+        if self.prefix_sources:
+            # A prefix redirect carries its suffix over to the target, which the
+            # exact redirect of the target does not see, so its chain is kept.
+            for source in self.prefix_sources.intersection(flattened):
+                flattened[source] = direct_redirects[source]
+            rewritten = [entry for entry in rewritten if entry[0] not in self.prefix_sources]
+        if rewritten:
+            logger.info("flattened %d redirect chains", len(rewritten))
+        for source, target, final_target in rewritten:
+            logger.debug("flattened %s -> %s into %s -> %s", source, target, source, final_target)
+        return flattened
+
+    def uncompressed_object_count(self, direct_redirects: dict[str, str]) -> int:
+        """Count the Traefik objects the map would need without compression."""
+        layout = self.layout
+        routers_per_rule = self.routers_per_rule
+        targets = len(set(direct_redirects.values()))
+        if layout == LAYOUT_COMPACT:
+            return routers_per_rule + targets
+        if layout == LAYOUT_SHARED_MIDDLEWARE:
+            return routers_per_rule * len(direct_redirects) + targets
+        return (routers_per_rule + 1) * len(direct_redirects)
+
+    def _add_compact_entries(
+        self,
+        routers: dict[str, dict],
+        middlewares: dict[str, dict],
+        direct_redirects: dict[str, str],
+        groups: list["RedirectGroup"],
+        priorities: dict[str, int],
+    ) -> None:
+        """Render every redirect into one router pair and one middleware per target.
+
+        redirectRegex can only produce a single replacement, so sources sharing a
+        target are folded into one alternation and the router chains all of them;
+        a middleware whose regex does not match passes the request on, and the
+        first one that matches redirects. Host-scoped middlewares are chained
+        first, as a host-scoped source wins over an unscoped one on its host.
+
+        Sources a prefix router outranks keep a router pair of their own, as the
+        compact router would outrank the prefix router in their place.
+        """
+        base_name = f"{self._app_name}-path-redirect"
+        shadowed = self.shadowed_sources(direct_redirects)
+        if shadowed:
+            own_redirects, direct_redirects = self._split_sources(direct_redirects, shadowed)
+            suffixes = self.name_suffixes(own_redirects)
+            for from_path, to_path in own_redirects.items():
+                self.add_redirect_entry(
+                    routers,
+                    middlewares,
+                    suffixes[from_path],
+                    from_path,
+                    to_path,
+                    priorities.get(from_path),
+                )
+
+        scoped_targets = {
+            self._target_key(source, target)
+            for source, target in direct_redirects.items()
+            if split_source(source)[0]
+        }
+        scoped_names, unscoped_names = [], []
+        for target_key, name in self._add_target_middlewares(
+            middlewares, direct_redirects
+        ).items():
+            (scoped_names if target_key in scoped_targets else unscoped_names).append(name)
+
+        group_suffixes = self.name_suffixes(self._group_key(group) for group in groups)
+        sources = list(direct_redirects)
+        scoped_groups, unscoped_groups = [], []
+        for group in groups:
+            middleware_name = (
+                f"{base_name}-group-{group_suffixes[self._group_key(group)]}-middleware"
+            )
+            (scoped_groups if group.host else unscoped_groups).append(middleware_name)
+            middlewares[middleware_name] = self._group_middleware(group)
+            sources.extend(group.sources)
+        middleware_names = scoped_names + scoped_groups + unscoped_names + unscoped_groups
+        if not sources:
+            return
+
+        rule = combined_rule(sources)
+        self._add_router_pair(
+            routers, base_name, rule, middleware_names, self._max_priority(priorities, sources)
+        )
+
+    def _add_shared_middleware_entries(
+        self,
+        routers: dict[str, dict],
+        middlewares: dict[str, dict],
+        direct_redirects: dict[str, str],
+        priorities: dict[str, int],
+    ) -> None:
+        middleware_names = self._add_target_middlewares(middlewares, direct_redirects)
+        suffixes = self.name_suffixes(direct_redirects)
+        for from_path, to_path in direct_redirects.items():
+            router_name = f"{self._app_name}-path-redirect-{suffixes[from_path]}"
+            target_key = self._target_key(from_path, to_path)
+            self._add_router_pair(
+                routers,
+                router_name,
+                router_rule(from_path),
+                [middleware_names[target_key]],
+                priorities.get(from_path),
+            )
+
+    def _add_target_middlewares(
+        self, middlewares: dict[str, dict], direct_redirects: dict[str, str]
+    ) -> dict[str, str]:
+        """Add one middleware per distinct target and host, matching all of its sources.
+
+        Returns:
+            The middleware name for each key from ``_target_key``.
+        """
+        sources_by_target: dict[str, list[str]] = {}
+        for from_path, to_path in direct_redirects.items():
+            target_key = self._target_key(from_path, to_path)
+            sources_by_target.setdefault(target_key, []).append(from_path)
+
+        suffixes = self.name_suffixes(sources_by_target)
+        middleware_names = {}
+        for target_key, from_paths in sources_by_target.items():
+            middleware_name = (
+                f"{self._app_name}-path-redirect-target-{suffixes[target_key]}-middleware"
+            )
+            middleware_names[target_key] = middleware_name
+            middlewares[middleware_name] = self._redirect_middleware(
+                from_paths, direct_redirects[from_paths[0]]
+            )
+        return middleware_names
+
+    @staticmethod
+    def _target_key(from_path: str, to_path: str) -> str:
+        # One redirectRegex can only match a single origin pattern, so targets are
+        # shared per host.
+        host, _ = split_source(from_path)
+        return f"{host} {to_path}" if host else to_path
+
+    def add_compressed_groups(
+        self,
+        routers: dict[str, dict],
+        middlewares: dict[str, dict],
+        groups: list["RedirectGroup"],
+        priorities: dict[str, int],
+    ) -> None:
+        """Add a router pair and a middleware for each compressed group."""
+        suffixes = self.name_suffixes(self._group_key(group) for group in groups)
+        for group in groups:
+            base_name = f"{self._app_name}-path-redirect-group-{suffixes[self._group_key(group)]}"
+            middleware_name = f"{base_name}-middleware"
+            rule = combined_rule(group.sources)
+            self._add_router_pair(
+                routers,
+                base_name,
+                rule,
+                [middleware_name],
+                self._max_priority(priorities, group.sources),
+            )
+            middlewares[middleware_name] = self._group_middleware(group)
+
+    def _add_router_pair(
+        self,
+        routers: dict[str, dict],
+        router_name: str,
+        rule: str,
+        middleware_names: list[str],
+        priority: Optional[int] = None,
+    ) -> None:
+        """Add the plain and TLS routers for a rule, as limited by redirect_entrypoints."""
+        entrypoints = self.entrypoints
+        added = []
+        if entrypoints != ENTRYPOINTS_HTTPS:
+            routers[router_name] = {
+                "rule": rule,
+                "service": "noop@internal",
+                "middlewares": middleware_names,
+            }
+            added.append((routers[router_name], HTTP_ENTRYPOINT))
+        if entrypoints != ENTRYPOINTS_HTTP:
+            routers[f"{router_name}-tls"] = {
+                "rule": rule,
+                "service": "noop@internal",
+                "middlewares": middleware_names,
+                "tls": {},
+            }
+            added.append((routers[f"{router_name}-tls"], HTTPS_ENTRYPOINT))
+
+        for router, entrypoint in added:
+            if entrypoints != ENTRYPOINTS_ALL:
+                router["entryPoints"] = [entrypoint]
+            if priority is not None:
+                router["priority"] = priority
+
+    def _router_priorities(self, direct_redirects: dict[str, str]) -> dict[str, int]:
+        """Rank sources so that the most specific match wins.
+
+        Ranks are dense over the distinct (path length, host-scoped, exact)
+        specificities, so each path length takes at most four ranks and the
+        priority band holds at most 4 * (longest source path + 1) values,
+        however large the map is.
+        """
+        base = int_option(self._options, "router_priority_base")
+        if base <= 0:
+            return {}
+        specificities = sorted({self._specificity(source) for source in direct_redirects})
+        ranks = {specificity: rank for rank, specificity in enumerate(specificities)}
+        return {source: base + ranks[self._specificity(source)] for source in direct_redirects}
+
+    def _specificity(self, source: str) -> tuple[int, ...]:
+        host, path = split_source(source)
+        return (len(path.rstrip("/")), bool(host), source not in self.prefix_sources)
+
+    @staticmethod
+    def _max_priority(priorities: dict[str, int], sources: list[str]) -> Optional[int]:
+        if not priorities:
+            return None
+        return max(priorities[source] for source in sources)
+
+    @staticmethod
+    def _group_key(group: "RedirectGroup") -> str:
+        return f"{group.source_prefix} {group.target_prefix}"
+
+    @staticmethod
+    def _group_middleware(group: "RedirectGroup") -> dict:
+        return {
+            "redirectRegex": {
+                "regex": group.regex,
+                "replacement": group.replacement,
+                "permanent": True,
+            }
+        }
+
+    def name_suffixes(self, keys: Iterable[str]) -> dict[str, str]:
+        """Map each key to the suffix used in its Traefik object names.
+
+        Index suffixes follow map order, so inserting an entry renames every later
+        object. Hash suffixes only depend on the key itself; keys whose digests
+        collide are told apart by their sorted position.
+        """
+        if self._options.get("router_naming") != NAMING_HASH:
+            return {key: str(index) for index, key in enumerate(keys)}
+
+        by_digest: dict[str, list[str]] = {}
+        for key in keys:
+            digest = hashlib.sha256(key.encode()).hexdigest()[:HASH_NAME_LENGTH]
+            by_digest.setdefault(digest, []).append(key)
+
+        suffixes: dict[str, str] = {}
+        for digest, colliding in by_digest.items():
+            for position, key in enumerate(sorted(colliding)):
+                suffixes[key] = f"{digest}-{position}" if position else digest
+        return suffixes
+
+    def _redirect_middleware(self, from_paths: list[str], to_path: str) -> dict:
+        """Build a redirectRegex for sources that all share the same host scope."""
+        host, _ = split_source(from_paths[0])
+        paths = [split_source(from_path)[1] for from_path in from_paths]
+        if len(paths) == 1:
+            source_pattern = re.escape(paths[0])
+        else:
+            source_pattern = "(?:" + "|".join(re.escape(path) for path in paths) + ")"
+        replacement = to_path if is_absolute_url(to_path) else f"${{1}}{to_path}"
+        return {
+            "redirectRegex": {
+                "regex": rf"^(https?://{origin_pattern(host)}){source_pattern}$",
+                "replacement": replacement,
+                "permanent": True,
+            }
+        }
+
+    def add_redirect_entry(
+        self,
+        routers: dict[str, dict],
+        middlewares: dict[str, dict],
+        suffix: str,
+        from_path: str,
+        to_path: str,
+        priority: Optional[int] = None,
+    ) -> None:
+        """Add the router pair and middleware of a single redirect."""
+        if from_path not in self.prefix_sources:
+            base_name = f"{self._app_name}-path-redirect-{suffix}"
+            middleware_name = f"{base_name}-middleware"
+            self._add_router_pair(
+                routers, base_name, router_rule(from_path), [middleware_name], priority
+            )
+            middlewares[middleware_name] = self._redirect_middleware([from_path], to_path)
+            return
+
+        base_name = f"{self._app_name}-path-prefix-redirect-{suffix}"
+        middleware_name = f"{base_name}-middleware"
+        if priority is None:
+            # Traefik ranks routers by rule length, which would let the longer
+            # prefix rule beat exact redirects below it; rank it as the exact
+            # rule for its own path instead.
+            host, path = split_source(from_path)
+            priority = len(router_rule(join_source(host, path.rstrip("/") or "/")))
+        self._add_router_pair(
+            routers, base_name, prefix_rule(from_path), [middleware_name], priority
+        )
+        middlewares[middleware_name] = self._prefix_middleware(from_path, to_path)
+
+    @staticmethod
+    def _prefix_middleware(from_path: str, to_path: str) -> dict:
+        """Build a redirectRegex re-appending the rest of the path and the query string."""
+        host, path = split_source(from_path)
+        source_pattern = re.escape(path.rstrip("/"))
+        target = to_path.rstrip("/")
+        replacement = target if is_absolute_url(to_path) else f"${{1}}{target}"
+        return {
+            "redirectRegex": {
+                "regex": rf"^(https?://{origin_pattern(host)}){source_pattern}(/[^?]*)?(\?.*)?$",
+                "replacement": f"{replacement}${{2}}${{3}}",
+                "permanent": True,
+            }
+        }
@@ -0,0 +1,104 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+"""Helpers for redirect source keys, which may be scoped to a host.
+
+A source key is either a path such as ``/docs``, matching on every host Traefik
+serves, or a host directly followed by a path such as ``docs.example.com/docs``,
+matching on that host only. Keeping both in one flat string lets the map stay a
+plain ``dict[str, str]`` through parsing, analysis and rendering.
+"""
+
+import re
+from typing import Collection, Iterable, Optional
+
+HOSTNAME = r"[a-z0-9](?:[a-z0-9-]*[a-z0-9])?(?:\.[a-z0-9](?:[a-z0-9-]*[a-z0-9])?)*"
+HOST_PATTERN = re.compile(rf"^{HOSTNAME}$")
+
+
+def split_source(source: str) -> tuple[str, str]:
+    """Split a source key into its host (empty when unscoped) and path."""
+    if source.startswith("/"):
+        return "", source
+    host, _, path = source.partition("/")
+    return host, f"/{path}"
+
+
+def join_source(host: str, path: str) -> str:
+    """Build the source key for a path, scoped to host when one is given."""
+    return f"{host}{path}"
+
+
+def origin_pattern(host: str) -> str:
+    """Return the redirectRegex pattern matching the origin after the scheme."""
+    if not host:
+        return "[^/]+"
+    return rf"{re.escape(host)}(?::[0-9]+)?"
+
+
+def router_rule(source: str, rule_type: str = "Path") -> str:
+    """Return the Traefik rule matching a source key."""
+    host, path = split_source(source)
+    if not host:
+        return f"{rule_type}(`{path}`)"
+    return f"Host(`{host}`) && {rule_type}(`{path}`)"
+
+
+def prefix_rule(source: str) -> str:
+    """Return the Traefik rule matching a source key and every path below it."""
+    host, path = split_source(source)
+    base = path.rstrip("/")
+    # PathPrefix(`/blog`) would also match /blogger, so the subtree is matched
+    # with a trailing slash and the bare path on its own.
+    rule = f"PathPrefix(`{base}/`) || Path(`{base}`)" if base else "PathPrefix(`/`)"
+    if not host:
+        return rule
+    return f"Host(`{host}`) && ({rule})" if base else f"Host(`{host}`) && {rule}"
+
+
+def combined_rule(sources: Iterable[str]) -> str:
+    """Return one Traefik rule matching any of the source keys."""
+    rules = []
+    for source in sources:
+        rule = router_rule(source)
+        rules.append(f"({rule})" if source[:1] != "/" else rule)
+    return " || ".join(rules)
+
+
+def is_absolute_url(value: str) -> bool:
+    """Whether a redirect target is an absolute URL rather than a path."""
+    return value.startswith("http://") or value.startswith("https://")
+
+
+def scoped_paths(sources: Iterable[str]) -> set[str]:
+    """Return the paths that have a host-scoped source."""
+    return {path for host, path in map(split_source, sources) if host}
+
+
+def next_hop(
+    host: str, target: str, redirects: dict[str, str], host_paths: Collection[str]
+) -> Optional[tuple[str, str]]:
+    """Return where a client lands after being redirected to ``target``, if on a source.
+
+    ``host`` is the host the redirected request was sent to, empty when it may
+    have been any host. A relative target stays on that host, where a
+    host-scoped source takes precedence over an unscoped one; when the host is
+    unknown and ``host_paths`` (see ``scoped_paths``) has the target, where the
+    client lands depends on the host, so the walk stops. Absolute targets are
+    only followed to sources scoped to the target's host, since only those are
+    known to be served by this Traefik.
+
+    Returns:
+        The host the next request is sent to and the source it matches.
+    """
+    if is_absolute_url(target):
+        target_host, _, path = target.partition("://")[2].partition("/")
+        candidate = join_source(target_host.lower(), f"/{path}")
+        return (target_host.lower(), candidate) if candidate in redirects else None
+
+    if host:
+        if join_source(host, target) in redirects:
+            return host, join_source(host, target)
+    elif target in host_paths:
+        return None
+    return (host, target) if target in redirects else None
@@ -0,0 +1,141 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+"""Check every entry of the redirect maps in one pass and report all problems.
+
+Stopping at the first invalid entry turns fixing a large generated map into one
+``juju config`` and hook round trip per error. A report instead collects one
+problem per invalid entry across all maps, keeping the first ``limit`` of them
+with their entries: the charm blocks with a summary of the first and the
+validate-redirects action lists the rest.
+
+Most entries are valid, so each is first matched against precompiled patterns
+of a valid source and target and only a mismatch is looked at check by check.
+"""
+
+import re
+from typing import Mapping, NamedTuple, Optional
+
+from redirect_sources import HOST_PATTERN, HOSTNAME, is_absolute_url, split_source
+
+# Invalid entries kept by a report; every one is still counted.
+REPORT_LIMIT = 1000
+
+# Whitespace and control characters cannot be part of a request path, and a
+# backtick would end the backtick-quoted path of the Traefik rule.
+_SOURCE_PATH = r"/[^\s\x00-\x1f\x7f`?#]*"
+# "$" is left out of targets as redirectRegex replacements expand it.
+_TARGET_REST = r"[^\s\x00-\x1f\x7f$]*"
+_URL_HOST = rf"(?i:{HOSTNAME})|\[[0-9A-Fa-f:.]+\]"
+_VALID_SOURCE = re.compile(rf"(?:{HOSTNAME})?{_SOURCE_PATH}")
+_VALID_TARGET = re.compile(
+    rf"/{_TARGET_REST}|https?://(?:{_URL_HOST})(?::[0-9]{{1,5}})?(?:[/?#]{_TARGET_REST})?"
+)
+_VALID_URL = re.compile(rf"https?://(?:{_URL_HOST})(?::[0-9]{{1,5}})?(?:[/?#].*)?", re.DOTALL)
+_UNSAFE_SOURCE = re.compile(r"[\s\x00-\x1f\x7f`]")
+_UNSAFE_TARGET = re.compile(r"[\s\x00-\x1f\x7f]")
+
+
+class ValidationIssue(NamedTuple):
+    """An invalid entry of a redirect map and what is wrong with it."""
+
+    name: str
+    source: str
+    target: str
+    problem: str
+
+    def describe(self) -> str:
+        """Return the problem with the entry it was found in."""
+        entry = f"{self.source} -> {self.target}" if self.target else self.source
+        return f"{self.name} {self.problem}: {entry}"
+
+
+class ValidationReport:
+    """Invalid entries found across redirect maps, keeping the first ``limit``."""
+
+    def __init__(self, limit: int = REPORT_LIMIT):
+        self.limit = limit
+        self.count = 0
+        self.issues: list[ValidationIssue] = []
+
+    def add(self, name: str, source: str, target: str, problem: str) -> None:
+        """Record an invalid entry."""
+        self.count += 1
+        if len(self.issues) < self.limit:
+            self.issues.append(ValidationIssue(name, source, target, problem))
+
+    def check(self, redirects: Mapping[str, str], name: str, prefix: bool = False) -> None:
+        """Check every entry of a map, recording the first problem of each invalid one.
+
+        Prefix redirects are also checked for targets inside their own source's
+        subtree, which would match again and grow the URL with every hop.
+        """
+        for source, target in redirects.items():
+            if _VALID_SOURCE.fullmatch(source) and _VALID_TARGET.fullmatch(target):
+                if prefix and _inside_own_subtree(source, target):
+                    self.add(
+                        name, source, target, "targets must not be inside their source's subtree"
+                    )
+                continue
+            problem = _source_problem(source) or _target_problem(target)
+            if problem:
+                self.add(name, source, target, problem)
+
+    def check_overlap(
+        self,
+        prefix_redirects: Mapping[str, str],
+        prefix_name: str,
+        redirects: Mapping[str, str],
+        name: str,
+    ) -> None:
+        """Record prefix sources that are also exact sources in another map."""
+        for source, target in prefix_redirects.items():
+            if source in redirects:
+                self.add(prefix_name, source, target, f"sources must not also be in {name}")
+
+    def summary(self) -> Optional[str]:
+        """Summarize the report in one line, or return None when it is empty."""
+        if not self.count:
+            return None
+        first = self.issues[0].describe()
+        return first if self.count == 1 else f"{self.count} invalid entries, first: {first}"
+
+
+def _source_problem(source: str) -> Optional[str]:
+    if not source:
+        return "keys must be non-empty"
+    if "/" not in source:
+        return "keys must start with '/'"
+    host, path = split_source(source)
+    if host and not HOST_PATTERN.match(host):
+        return "host keys must be valid hostnames"
+    if _UNSAFE_SOURCE.search(path):
+        return "keys must not contain whitespace, control characters or backticks"
+    if "?" in path or "#" in path:
+        return "keys must be paths without a query string or fragment"
+    return None
+
+
+def _target_problem(target: str) -> Optional[str]:
+    if not target:
+        return "values must be non-empty"
+    if not is_absolute_url(target) and not target.startswith("/"):
+        return "values must start with '/' or be an absolute URL"
+    if _UNSAFE_TARGET.search(target):
+        return "values must not contain whitespace or control characters"
+    if "$" in target:
+        return "values must not contain '$', which redirectRegex replacements expand"
+    if not _VALID_URL.fullmatch(target) and not target.startswith("/"):
+        return "values must be absolute URLs with a valid host and port"
+    return None
+
+
+def _inside_own_subtree(source: str, target: str) -> bool:
+    host, path = split_source(source)
+    if is_absolute_url(target):
+        target_host, _, target_path = target.partition("://")[2].partition("/")
+        if not host or target_host.lower() != host:
+            return False
+        target = f"/{target_path}"
+    base = path.rstrip("/")
+    return target == base or target.startswith(f"{base}/")
@@ -0,0 +1,153 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+"""On-disk cache of the Traefik objects rendered for each redirect.
+
+Each fragment holds the JSON members an entry adds to the routers and
+middlewares objects, stored under a key built from everything that determines
+it. An entry whose key is unchanged since the previous render is reused as-is,
+and the published config is spliced from the fragments as text, so neither the
+rendering nor the serialization of unchanged entries is repeated. Fragments are
+kept per shard, as a dispatch only re-renders the shards whose entries changed.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Collection, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the rendered shape of an entry changes.
+CACHE_VERSION = 3
+# json.dumps builds a new encoder per call when given options; fragments are
+# serialized one entry at a time, so reuse a single one.
+_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+
+def serialize_members(objects: dict[str, dict]) -> str:
+    """Serialize objects as the members of a JSON object, without the braces."""
+    return _ENCODER.encode(objects)[1:-1]
+
+
+def splice_config(router_members: Iterable[str], middleware_members: Iterable[str]) -> str:
+    """Build the compact JSON of a Traefik dynamic config from serialized members.
+
+    The document is joined once from references to the members, so the only new
+    copy of the config is the result.
+    """
+    pieces = ['{"http":{"routers":{']
+    _append_members(pieces, router_members)
+    pieces.append('},"middlewares":{')
+    _append_members(pieces, middleware_members)
+    pieces.append("}}}")
+    return "".join(pieces)
+
+
+def _append_members(pieces: list[str], members: Iterable[str]) -> None:
+    separator = ""
+    for member in members:
+        if member:
+            if separator:
+                pieces.append(separator)
+            pieces.append(member)
+            separator = ","
+
+
+def encoded_length(text: str) -> int:
+    """Return the UTF-8 size of text without encoding it when it is ASCII.
+
+    The JSON encoders escape everything else, so configs are ASCII and their
+    size is known without a second copy.
+    """
+    return len(text) if text.isascii() else len(text.encode())
+
+
+class RenderCache:
+    """Fragments from the previous render, and the ones used by the current one.
+
+    Fragments are grouped by shard, one per traefik-route relation, so that
+    saving after rendering some shards keeps the fragments of the others.
+    """
+
+    def __init__(self, path: Path, signature: str):
+        self._path = path
+        self._signature = f"{CACHE_VERSION}:{signature}"
+        self._previous = self._load()
+        self._current: dict[str, dict[str, tuple[str, str]]] = {}
+        self.reused = 0
+        self.rendered = 0
+
+    def _load(self) -> dict[str, dict[str, tuple[str, str]]]:
+        try:
+            data = json.loads(self._path.read_text())
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("signature") != self._signature:
+            return {}
+        return {
+            shard: {key: tuple(fragment) for key, fragment in fragments.items()}
+            for shard, fragments in data.get("shards", {}).items()
+        }
+
+    @staticmethod
+    def key(
+        suffix: str, source: str, target: str, priority: Optional[int], prefix: bool = False
+    ) -> str:
+        """Build the key of an entry's fragment from everything that determines it."""
+        return f"{suffix}\0{source}\0{target}\0{priority}\0{prefix:d}"
+
+    def get(self, key: str, shard: str = "") -> Optional[tuple[str, str]]:
+        """Return the fragment previously rendered for key in a shard, if any."""
+        fragment = self._previous.get(shard, {}).get(key)
+        current = self._current.setdefault(shard, {})
+        if fragment is not None and key not in current:
+            current[key] = fragment
+            self.reused += 1
+        return fragment
+
+    def put(self, key: str, fragment: tuple[str, str], shard: str = "") -> None:
+        """Record a freshly rendered fragment of a shard."""
+        self._current.setdefault(shard, {})[key] = fragment
+        self.rendered += 1
+
+    def save(self, shards: Optional[Collection[str]] = None) -> None:
+        """Persist the fragments used since loading, when they differ from the file.
+
+        Shards not rendered since loading keep their previous fragments, unless
+        they are left out of ``shards``.
+        """
+        fragments = {**self._previous, **self._current}
+        if shards is not None:
+            fragments = {shard: fragments[shard] for shard in fragments if shard in shards}
+        unchanged = fragments.keys() == self._previous.keys() and all(
+            len(fragments[shard]) == len(self._previous[shard]) for shard in fragments
+        )
+        if not self.rendered and unchanged:
+            return
+        tmp_path = self._path.with_name(f"{self._path.name}.tmp")
+        try:
+            # Written one fragment at a time: the whole file is as large as the
+            # configs it caches.
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                handle.write(f'{{"signature":{_ENCODER.encode(self._signature)},"shards":{{')
+                shard_separator = ""
+                for shard, shard_fragments in fragments.items():
+                    handle.write(f"{shard_separator}{_ENCODER.encode(shard)}:{{")
+                    separator = ""
+                    for key, fragment in shard_fragments.items():
+                        handle.write(
+                            f"{separator}{_ENCODER.encode(key)}:{_ENCODER.encode(fragment)}"
+                        )
+                        separator = ","
+                    handle.write("}")
+                    shard_separator = ","
+                handle.write("}}")
+            os.replace(tmp_path, self._path)
+        except OSError as exc:
+            logger.warning("could not write render cache %s: %s", self._path, exc)
+            return
+        self._previous = fragments
+        self._current = {}
+        self.reused = self.rendered = 0
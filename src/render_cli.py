@@ -0,0 +1,152 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+"""Render a redirect map to Traefik dynamic config without deploying the charm.
+
+Reads the map from a file, or from stdin when the path is omitted or ``-``, in
+any format the redirect-map resource accepts, validates it like the charm does
+and writes the compact JSON config to stdout as it is rendered. Exits with
+status 1 and the validation errors on stderr, one line per invalid entry, when
+the map would block the charm, so CI pipelines can check a map before attaching
+it::
+
+    python -m render_cli redirects.csv --layout compact > traefik.json
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional, TextIO
+
+from redirect_maps import check_redirects, merge_redirect_maps, parse_redirect_file
+from redirect_render import (
+    REDIRECT_ENTRYPOINTS,
+    REDIRECT_LAYOUTS,
+    ROUTER_NAMINGS,
+    RedirectRenderer,
+)
+from redirect_validation import ValidationReport
+
+# Names of the maps in error messages, as in the charm's blocked status.
+MAP_NAME = "redirect map"
+PREFIX_MAP_NAME = "prefix map"
+
+
+def _arguments(argv: Optional[list[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="render_cli",
+        description="Render a redirect map to Traefik dynamic config on stdout.",
+    )
+    parser.add_argument(
+        "path", nargs="?", default="-", help="redirect map file, or - for stdin (default)"
+    )
+    parser.add_argument(
+        "--prefix-map",
+        metavar="PATH",
+        help="map of prefix redirects, as in the prefix_path_redirects option",
+    )
+    parser.add_argument(
+        "--app-name",
+        default="traefik-k8s-path-redirector",
+        help="application name prefixing every Traefik object name",
+    )
+    parser.add_argument("--layout", choices=REDIRECT_LAYOUTS, default=REDIRECT_LAYOUTS[0])
+    parser.add_argument("--naming", choices=ROUTER_NAMINGS, default=ROUTER_NAMINGS[0])
+    parser.add_argument(
+        "--entrypoints", choices=REDIRECT_ENTRYPOINTS, default=REDIRECT_ENTRYPOINTS[0]
+    )
+    parser.add_argument("--compress", action="store_true", help="compress prefix rewrites")
+    parser.add_argument("--flatten", action="store_true", help="flatten redirect chains")
+    parser.add_argument("--priority-base", type=int, default=0, metavar="N")
+    return parser.parse_args(argv)
+
+
+def _load(
+    path: str, stdin: TextIO, report: ValidationReport
+) -> tuple[dict[str, str], Optional[str]]:
+    if path != "-":
+        return parse_redirect_file(Path(path), MAP_NAME, report)
+    # The parser sniffs the format and rewinds, which a pipe cannot do.
+    with tempfile.NamedTemporaryFile("w+", encoding="utf-8", suffix=".map") as spool:
+        shutil.copyfileobj(stdin, spool)
+        spool.flush()
+        return parse_redirect_file(Path(spool.name), MAP_NAME, report)
+
+
+def _load_maps(
+    arguments: argparse.Namespace, stdin: TextIO, report: ValidationReport
+) -> tuple[dict[str, str], dict[str, str], Optional[str]]:
+    """Load the redirect map merged with the prefix map, and the prefix map alone.
+
+    Invalid entries of either map are recorded in the report rather than failing
+    the load, so that they are all listed at once.
+    """
+    prefix_redirects: dict[str, str] = {}
+    if arguments.prefix_map:
+        prefix_redirects, error = parse_redirect_file(
+            Path(arguments.prefix_map), PREFIX_MAP_NAME, report
+        )
+        if error:
+            return {}, {}, error
+
+    redirects, error = _load(arguments.path, stdin, report)
+    if error:
+        return {}, {}, error
+    merged = merge_redirect_maps(
+        report, {}, "", redirects, MAP_NAME, dict(prefix_redirects), PREFIX_MAP_NAME
+    )
+    return merged or {}, prefix_redirects, None
+
+
+def _print_report(report: ValidationReport, stderr: TextIO) -> None:
+    for issue in report.issues:
+        print(f"error: {issue.describe()}", file=stderr)
+    if report.count > len(report.issues):
+        print(f"error: {report.count - len(report.issues)} more invalid entries", file=stderr)
+
+
+def main(
+    argv: Optional[list[str]] = None,
+    stdin: TextIO = sys.stdin,
+    stdout: TextIO = sys.stdout,
+    stderr: TextIO = sys.stderr,
+) -> int:
+    """Run the command line, returning the exit status."""
+    from redirect_analysis import analyze_redirects
+
+    arguments = _arguments(argv)
+    options = {
+        "redirect_layout": arguments.layout,
+        "router_naming": arguments.naming,
+        "redirect_entrypoints": arguments.entrypoints,
+        "compress_redirects": arguments.compress,
+        "flatten_redirect_chains": arguments.flatten,
+        "router_priority_base": arguments.priority_base,
+    }
+    report = ValidationReport()
+    try:
+        redirects, prefix_redirects, error = _load_maps(arguments, stdin, report)
+    except OSError as exc:
+        redirects, prefix_redirects = {}, {}
+        error = f"cannot read {exc.filename}: {exc.strerror}"
+    if not error and report.count:
+        _print_report(report, stderr)
+        return 1
+    error = error or check_redirects(
+        redirects, options, analyze_redirects(redirects, prefix_redirects)
+    )
+    if error:
+        print(f"error: {error}", file=stderr)
+        return 1
+
+    renderer = RedirectRenderer(arguments.app_name, options, prefix_redirects)
+    for chunk in renderer.iter_json(redirects):
+        stdout.write(chunk)
+    stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
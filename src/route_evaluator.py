@@ -0,0 +1,260 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+"""Evaluate URLs against a rendered Traefik dynamic config, without Traefik.
+
+Emulates the parts of Traefik routing the published configs rely on: routers
+matching ``Host``, ``Path`` and ``PathPrefix`` rules combined with ``&&``, ``||``
+and parentheses, the highest priority router winning (the rule length unless
+set, ties going to the first name in sort order), TLS routers only serving
+https and redirectRegex middlewares.
+
+Rules are expanded into alternatives of one host and one path matcher and
+indexed by host and path, so a lookup costs a few dictionary probes per
+character of the path instead of a scan over every router.
+"""
+
+import re
+from typing import Callable, Iterator, NamedTuple, Optional, Union
+from urllib.parse import urljoin, urlsplit
+
+MAX_HOPS = 10
+ENTRYPOINTS = {"http": "web", "https": "websecure"}
+
+_TOKEN = re.compile(r"\s*(?:(Host|PathPrefix|Path)\(\s*`([^`]*)`\s*\)|(&&|\|\||\(|\)))")
+# Go's ${name} and $name references, as used in redirectRegex replacements.
+_GO_REFERENCE = re.compile(r"\$(?:\{(\w+)\}|(\w+))")
+
+
+class Evaluation(NamedTuple):
+    """Where a URL ends up.
+
+    Attributes:
+        url: The evaluated URL.
+        target: The URL after following every redirect, None when not redirected.
+        hops: Number of redirects followed.
+        router: Router matching the original URL, None when none matches.
+        loop: Whether following redirects revisited a URL or exceeded the hop limit.
+    """
+
+    url: str
+    target: Optional[str]
+    hops: int
+    router: Optional[str]
+    loop: bool
+
+    def as_dict(self) -> dict[str, object]:
+        """Return the evaluation keyed by field name."""
+        return self._asdict()
+
+
+class _Route(NamedTuple):
+    name: str
+    priority: int
+    tls: bool
+    entrypoints: Optional[frozenset[str]]
+    middlewares: tuple[str, ...]
+
+
+def parse_rule(rule: str) -> list[dict[str, str]]:
+    """Expand a router rule into alternatives, each a map of matcher name to value.
+
+    Raises:
+        ValueError: If the rule uses anything but the supported matchers, or an
+            alternative needs two values of the same matcher.
+    """
+    tokens = list(_tokenize(rule))
+    alternatives, position = _parse_or(tokens, 0)
+    if position != len(tokens):
+        raise ValueError(f"unexpected {tokens[position][1]!r} in rule {rule!r}")
+    return alternatives
+
+
+def _tokenize(rule: str) -> Iterator[tuple[str, str]]:
+    position = 0
+    while position < len(rule.rstrip()):
+        match = _TOKEN.match(rule, position)
+        if not match:
+            raise ValueError(f"unsupported rule {rule!r}")
+        matcher, value, operator = match.groups()
+        yield (matcher, value) if matcher else ("op", operator)
+        position = match.end()
+
+
+def _parse_or(tokens: list[tuple[str, str]], position: int) -> tuple[list[dict], int]:
+    alternatives, position = _parse_and(tokens, position)
+    while position < len(tokens) and tokens[position] == ("op", "||"):
+        more, position = _parse_and(tokens, position + 1)
+        alternatives = alternatives + more
+    return alternatives, position
+
+
+def _parse_and(tokens: list[tuple[str, str]], position: int) -> tuple[list[dict], int]:
+    alternatives, position = _parse_operand(tokens, position)
+    while position < len(tokens) and tokens[position] == ("op", "&&"):
+        other, position = _parse_operand(tokens, position + 1)
+        alternatives = [_merge(left, right) for left in alternatives for right in other]
+    return alternatives, position
+
+
+def _parse_operand(tokens: list[tuple[str, str]], position: int) -> tuple[list[dict], int]:
+    if position >= len(tokens):
+        raise ValueError("rule ends unexpectedly")
+    kind, value = tokens[position]
+    if kind != "op":
+        return [{kind: value}], position + 1
+    if value != "(":
+        raise ValueError(f"unexpected {value!r} in rule")
+    alternatives, position = _parse_or(tokens, position + 1)
+    if position >= len(tokens) or tokens[position] != ("op", ")"):
+        raise ValueError("unbalanced parentheses in rule")
+    return alternatives, position + 1
+
+
+def _merge(left: dict[str, str], right: dict[str, str]) -> dict[str, str]:
+    paths = [matcher for matcher in (*left, *right) if matcher in ("Path", "PathPrefix")]
+    if len(paths) > 1 or set(left) & set(right):
+        raise ValueError("rules combining two matchers of the same kind are not supported")
+    return {**left, **right}
+
+
+def go_template(replacement: str, pattern: re.Pattern) -> Callable[[re.Match], str]:
+    """Translate a Go regexp replacement into a function expanding a match of pattern.
+
+    The replacement is split once, so expanding it does not parse it again for
+    every URL. As in Go, references to groups the pattern lacks expand to nothing.
+    """
+    parts: list[tuple[str, Union[int, str, None]]] = []
+    position = 0
+    for reference in _GO_REFERENCE.finditer(replacement):
+        name = reference.group(1) or reference.group(2)
+        group = int(name) if name.isdigit() else name
+        known = group in pattern.groupindex or (isinstance(group, int) and group <= pattern.groups)
+        parts.append((replacement[position : reference.start()], group if known else None))
+        position = reference.end()
+    tail = replacement[position:]
+
+    def expand(match: re.Match) -> str:
+        expanded = [
+            literal + (match.group(group) or "" if group is not None else "")
+            for literal, group in parts
+        ]
+        return "".join(expanded) + tail
+
+    return expand
+
+
+class RouteIndex:
+    """Routers of a Traefik dynamic config, indexed by host and path."""
+
+    def __init__(self, config: dict):
+        http = config.get("http", {})
+        self._middlewares: dict[str, dict] = http.get("middlewares", {})
+        self._patterns: dict[str, tuple[re.Pattern, Callable[[re.Match], str]]] = {}
+        self._exact: dict[tuple[str, str], list[_Route]] = {}
+        self._prefix: dict[tuple[str, str], list[_Route]] = {}
+        # Plain and TLS routers come in pairs sharing a rule.
+        self._parsed_rules: dict[str, list[dict[str, str]]] = {}
+        for name, router in http.get("routers", {}).items():
+            self._add_router(name, router)
+        del self._parsed_rules
+        self._prefix_lengths = sorted({len(path) for _, path in self._prefix})
+
+    def _add_router(self, name: str, router: dict) -> None:
+        entrypoints = router.get("entryPoints")
+        route = _Route(
+            name=name,
+            priority=router.get("priority") or len(router["rule"]),
+            tls="tls" in router,
+            entrypoints=frozenset(entrypoints) if entrypoints else None,
+            middlewares=tuple(router.get("middlewares", ())),
+        )
+        rule = router["rule"]
+        if rule not in self._parsed_rules:
+            self._parsed_rules[rule] = parse_rule(rule)
+        for alternative in self._parsed_rules[rule]:
+            host = alternative.get("Host", "").lower()
+            if "Path" in alternative:
+                self._exact.setdefault((host, alternative["Path"]), []).append(route)
+            else:
+                prefix = alternative.get("PathPrefix", "/")
+                self._prefix.setdefault((host, prefix), []).append(route)
+
+    def match(self, scheme: str, host: str, path: str) -> Optional[_Route]:
+        """Return the router Traefik would pick for a request, if any."""
+        host = host.lower()
+        candidates = []
+        for key_host in {host, ""}:
+            candidates.extend(self._exact.get((key_host, path), ()))
+            for length in self._prefix_lengths:
+                if length > len(path):
+                    break
+                candidates.extend(self._prefix.get((key_host, path[:length]), ()))
+
+        tls = scheme == "https"
+        entrypoint = ENTRYPOINTS[scheme]
+        serving = [
+            route
+            for route in candidates
+            if route.tls == tls and (route.entrypoints is None or entrypoint in route.entrypoints)
+        ]
+        if not serving:
+            return None
+        return min(serving, key=lambda route: (-route.priority, route.name))
+
+    def redirect(self, url: str) -> tuple[Optional[str], Optional[str]]:
+        """Return the router matching a URL and where it redirects to, if anywhere.
+
+        Raises:
+            ValueError: If the URL is not an absolute http or https URL.
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ENTRYPOINTS or not parts.hostname:
+            raise ValueError(f"not an absolute http or https URL: {url}")
+        # Clients send the host in lower case, which is what the regexes are built for.
+        url = parts._replace(netloc=parts.netloc.lower()).geturl()
+        route = self.match(parts.scheme, parts.hostname, parts.path or "/")
+        if not route:
+            return None, None
+        for middleware_name in route.middlewares:
+            compiled = self._pattern(middleware_name)
+            if not compiled:
+                continue
+            pattern, replacement = compiled
+            # Traefik matches the regex against the whole request URL, query included.
+            if pattern.search(url):
+                return route.name, pattern.sub(replacement, url)
+        return route.name, None
+
+    def _pattern(
+        self, middleware_name: str
+    ) -> Optional[tuple[re.Pattern, Callable[[re.Match], str]]]:
+        if middleware_name not in self._patterns:
+            options = self._middlewares.get(middleware_name, {}).get("redirectRegex")
+            if not options:
+                return None
+            pattern = re.compile(options["regex"])
+            self._patterns[middleware_name] = (
+                pattern,
+                go_template(options["replacement"], pattern),
+            )
+        return self._patterns[middleware_name]
+
+    def evaluate(self, url: str, max_hops: int = MAX_HOPS) -> Evaluation:
+        """Follow the redirects of a URL until it is no longer redirected.
+
+        Raises:
+            ValueError: If a URL along the way is not an absolute http or https URL.
+        """
+        router, location = self.redirect(url)
+        target = None
+        hops = 0
+        seen = {url}
+        while location is not None:
+            target = urljoin(target or url, location)
+            hops += 1
+            if target in seen or hops > max_hops:
+                return Evaluation(url, target, hops, router, loop=True)
+            seen.add(target)
+            _, location = self.redirect(target)
+        return Evaluation(url, target, hops, router, loop=False)
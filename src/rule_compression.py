@@ -0,0 +1,132 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+"""Fold literal redirects sharing a prefix-to-prefix rewrite into single rules.
+
+Maps that grew out of migrations are dominated by entries such as
+``/docs/v1/<page>`` -> ``/docs/latest/<page>``. Every such entry keeps its
+own suffix, so a group of them can be served by one redirectRegex that
+captures the suffix and re-appends it to the new prefix.
+"""
+
+import logging
+import re
+from typing import NamedTuple, Optional
+
+from redirect_sources import is_absolute_url, origin_pattern, split_source
+
+logger = logging.getLogger(__name__)
+
+MIN_GROUP_SIZE = 2
+# Any host works for the equivalence check of unscoped sources.
+_PROBE_HOST = "redirect.invalid"
+
+
+class RedirectGroup(NamedTuple):
+    """Redirects of the form ``source_prefix + suffix`` -> ``target_prefix + suffix``."""
+
+    source_prefix: str
+    target_prefix: str
+    suffixes: tuple[str, ...]
+
+    @property
+    def sources(self) -> list[str]:
+        """Source paths covered by the group."""
+        return [self.source_prefix + suffix for suffix in self.suffixes]
+
+    @property
+    def host(self) -> str:
+        """Host the group's sources are scoped to, empty when unscoped."""
+        return split_source(self.sources[0])[0]
+
+    @property
+    def regex(self) -> str:
+        """Pattern for redirectRegex capturing the origin and the preserved suffix."""
+        alternation = "|".join(re.escape(suffix) for suffix in self.suffixes)
+        path_prefix = re.escape(self.source_prefix[len(self.host) :])
+        return rf"^(https?://{origin_pattern(self.host)}){path_prefix}({alternation})$"
+
+    @property
+    def replacement(self) -> str:
+        """Replacement for redirectRegex re-appending the captured suffix."""
+        if is_absolute_url(self.target_prefix):
+            return f"{self.target_prefix}${{2}}"
+        return f"${{1}}{self.target_prefix}${{2}}"
+
+
+def shared_suffix(from_path: str, to_path: str) -> Optional[str]:
+    """Return the longest common suffix of both paths that starts a path segment."""
+    length = 0
+    for from_char, to_char in zip(reversed(from_path), reversed(to_path)):
+        if from_char != to_char:
+            break
+        length += 1
+    if not length:
+        return None
+
+    start = from_path.find("/", len(from_path) - length)
+    if start == -1:
+        return None
+    suffix = from_path[start:]
+    # Identical paths leave no prefix to rewrite.
+    if suffix == from_path and suffix == to_path:
+        return None
+    return suffix
+
+
+def compress_redirects(
+    redirects: dict[str, str], min_group_size: int = MIN_GROUP_SIZE
+) -> tuple[dict[str, str], list[RedirectGroup]]:
+    """Split redirects into groups proven equivalent and the entries left as-is.
+
+    Returns:
+        The redirects that were not grouped, in their original order, and the groups.
+    """
+    candidates: dict[tuple[str, str], list[str]] = {}
+    for from_path, to_path in redirects.items():
+        suffix = shared_suffix(from_path, to_path)
+        if suffix is None:
+            continue
+        prefixes = (from_path[: -len(suffix)], to_path[: -len(suffix)])
+        candidates.setdefault(prefixes, []).append(suffix)
+
+    groups = []
+    grouped: set[str] = set()
+    for (source_prefix, target_prefix), suffixes in candidates.items():
+        if len(suffixes) < min_group_size:
+            continue
+        group = RedirectGroup(source_prefix, target_prefix, tuple(suffixes))
+        if not is_equivalent(group, redirects):
+            logger.warning(
+                "not compressing %s -> %s: not equivalent", source_prefix, target_prefix
+            )
+            continue
+        groups.append(group)
+        grouped.update(group.sources)
+
+    remaining = {key: value for key, value in redirects.items() if key not in grouped}
+    return remaining, groups
+
+
+def is_equivalent(group: RedirectGroup, redirects: dict[str, str]) -> bool:
+    """Check that the group redirects each of its sources exactly like the literal map.
+
+    The group regex is anchored on both ends and alternates over literal
+    suffixes, so it cannot match anything outside its sources; what remains to
+    prove is that every source yields its original target.
+    """
+    pattern = re.compile(group.regex)
+    absolute = is_absolute_url(group.target_prefix)
+    for source, suffix in zip(group.sources, group.suffixes):
+        target = redirects.get(source)
+        if target is None or target != group.target_prefix + suffix:
+            return False
+        host, path = split_source(source)
+        origin = f"http://{host or _PROBE_HOST}"
+        match = pattern.match(origin + path)
+        if not match or match.group(1) != origin or match.group(2) != suffix:
+            return False
+        rendered = ("" if absolute else match.group(1)) + group.target_prefix + match.group(2)
+        if rendered != (target if is_absolute_url(target) else origin + target):
+            return False
+    return True
@@ -0,0 +1,77 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+"""Split a redirect map across several Traefik relations with consistent hashing.
+
+Each relation owns a set of points on a hash ring. A redirect belongs to the
+relation owning the first point at or after the hash of its shard key, so adding
+or removing a relation only moves the keys next to that relation's points
+instead of reshuffling the whole map.
+"""
+
+import bisect
+import hashlib
+from typing import Iterable
+
+from redirect_sources import split_source
+
+SHARD_BY_HOST = "host"
+SHARD_BY_PREFIX = "prefix"
+SHARD_STRATEGIES = (SHARD_BY_HOST, SHARD_BY_PREFIX)
+# Points per shard on the ring; more points spread keys more evenly.
+RING_REPLICAS = 64
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.sha256(value.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash ring mapping keys to shard ids."""
+
+    def __init__(self, shard_ids: Iterable[int], replicas: int = RING_REPLICAS):
+        points = sorted(
+            (_hash(f"{shard_id}-{replica}"), shard_id)
+            for shard_id in shard_ids
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._shards = [shard_id for _, shard_id in points]
+
+    def shard_for(self, key: str) -> int:
+        """Return the shard id owning key."""
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._shards[index]
+
+
+def shard_key(source: str, strategy: str) -> str:
+    """Return the key a source is sharded by; empty when it belongs on every shard.
+
+    Unscoped sources match on every host, so when sharding by host they are
+    published to all shards.
+    """
+    host, path = split_source(source)
+    if strategy == SHARD_BY_HOST:
+        return host
+    first_segment = path.split("/", 2)[1]
+    return f"{host}/{first_segment}"
+
+
+def shard_redirects(
+    redirects: dict[str, str], shard_ids: list[int], strategy: str
+) -> dict[int, dict[str, str]]:
+    """Split redirects into one map per shard id, keeping the original order."""
+    shards: dict[int, dict[str, str]] = {shard_id: {} for shard_id in shard_ids}
+    if len(shard_ids) == 1:
+        shards[shard_ids[0]] = redirects
+        return shards
+
+    ring = HashRing(shard_ids)
+    for source, target in redirects.items():
+        key = shard_key(source, strategy)
+        if not key:
+            for shard in shards.values():
+                shard[source] = target
+            continue
+        shards[ring.shard_for(key)][source] = target
+    return shards
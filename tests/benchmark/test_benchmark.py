@@ -0,0 +1,171 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+#
+# Run with `tox -e benchmark`; set BENCHMARK_LARGE=1 to include the 100k-entry map.
+
+import json
+import logging
+import os
+import time
+import tracemalloc
+
+import pytest
+from ops import testing
+
+import redirect_maps
+from charm import RELATION_NAME, TraefikK8SPathRedirectorCharm
+from redirect_analysis import analyze_redirects
+from redirect_validation import ValidationReport
+
+logger = logging.getLogger(__name__)
+
+SIZES = [1_000, 10_000, 100_000]
+STAGES = ("parse", "validate", "render", "publish")
+
+# Per-stage wall time may grow at most this much faster than the entry count
+# between consecutive sizes; a quadratic stage grows ~10x faster.
+MAX_SCALING_FACTOR = 3.0
+# Generous absolute ceiling so a pathological regression fails even on one size.
+MAX_SECONDS_PER_10K_ENTRIES = 5.0
+# Rendering holds each entry's serialized fragments, which the render cache
+# keeps, plus the spliced config: about two payloads at its peak.
+MAX_RENDER_PEAK_PER_PAYLOAD_BYTE = 2.5
+
+_results: dict[int, dict[str, dict[str, float]]] = {}
+
+
+def _redirect_map(size: int) -> str:
+    # Half of the map is chained: one long chain with a head redirected into
+    # each of its links, the worst case for chain analysis.
+    chained = size // 4
+    redirects = {
+        f"/legacy/section-{i % 97}/page-{i}": f"/docs/section-{i % 97}/page-{i}"
+        for i in range(size - 2 * chained)
+    }
+    redirects.update({f"/chain/{i}": f"/chain/{i + 1}" for i in range(chained)})
+    redirects.update({f"/head/{i}": f"/chain/{i}" for i in range(chained)})
+    return json.dumps(redirects)
+
+
+def _validate(redirects: dict[str, str], options, report: ValidationReport):
+    # The checks the charm runs before rendering, map analysis included.
+    report.check(redirects, "direct_path_redirects")
+    return redirect_maps.check_redirects(redirects, options, analyze_redirects(redirects))
+
+
+def _measure(stage: str, profile: dict, func, *args, **kwargs):
+    # Time and memory are taken on separate calls, tracemalloc skews timings.
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    profile[stage] = {"seconds": elapsed, "peak_bytes": peak}
+    return result
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_reconcile_stages(size, request):
+    if size >= 100_000 and not os.environ.get("BENCHMARK_LARGE"):
+        pytest.skip("set BENCHMARK_LARGE=1 to benchmark 100k entries")
+
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    state_in = testing.State(
+        leader=True,
+        relations={relation},
+        config={"direct_path_redirects": _redirect_map(size)},
+    )
+    profile: dict[str, dict[str, float]] = {}
+
+    with ctx(ctx.on.update_status(), state_in) as manager:
+        charm = manager.charm
+        raw_value = charm.model.config["direct_path_redirects"]
+        report = ValidationReport()
+        redirects, error = _measure(
+            "parse",
+            profile,
+            redirect_maps.parse_redirect_map,
+            raw_value,
+            "direct_path_redirects",
+            report,
+        )
+        assert error is None
+        error = _measure("validate", profile, _validate, redirects, charm.model.config, report)
+        assert error is None
+        assert report.count == 0
+        plan = _measure("render", profile, charm._render_published_config, redirects)
+        relation = charm.model.get_relation(RELATION_NAME)
+        _measure("publish", profile, charm._publish, relation, plan.config)
+        state_out = manager.run()
+
+    payload = state_out.get_relation(relation.id).local_app_data["config"]
+    profile["payload"] = {"bytes": len(payload.encode())}
+    _results[size] = profile
+
+    logger.info(
+        "%d entries: %s; payload %d bytes",
+        size,
+        ", ".join(
+            f"{stage} {profile[stage]['seconds'] * 1000:.1f}ms "
+            f"(peak {profile[stage]['peak_bytes'] / 1024:.0f}KiB)"
+            for stage in STAGES
+        ),
+        profile["payload"]["bytes"],
+    )
+    for stage in STAGES:
+        budget = MAX_SECONDS_PER_10K_ENTRIES * max(size, 10_000) / 10_000
+        assert profile[stage]["seconds"] < budget, f"{stage} took {profile[stage]['seconds']}s"
+    render_peak = profile["render"]["peak_bytes"]
+    assert render_peak < MAX_RENDER_PEAK_PER_PAYLOAD_BYTE * profile["payload"]["bytes"]
+
+
+def test_stages_scale_linearly():
+    sizes = sorted(_results)
+    if len(sizes) < 2:
+        pytest.skip("run together with test_reconcile_stages")
+
+    for smaller, larger in zip(sizes, sizes[1:]):
+        entry_ratio = larger / smaller
+        for stage in STAGES:
+            # Ignore timings too small to be measured reliably.
+            small_time = max(_results[smaller][stage]["seconds"], 0.001)
+            ratio = _results[larger][stage]["seconds"] / small_time
+            assert ratio < entry_ratio * MAX_SCALING_FACTOR, (
+                f"{stage} grew {ratio:.1f}x from {smaller} to {larger} entries"
+            )
+
+
+@pytest.mark.parametrize("size", [10_000, 100_000])
+def test_incremental_render(size, tmp_path):
+    if size >= 100_000 and not os.environ.get("BENCHMARK_LARGE"):
+        pytest.skip("set BENCHMARK_LARGE=1 to benchmark 100k entries")
+
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm, charm_root=tmp_path)
+    redirects = json.loads(_redirect_map(size))
+    config = {"direct_path_redirects": "{}", "router_naming": "hash"}
+
+    with ctx(ctx.on.update_status(), testing.State(leader=True, config=config)) as manager:
+        start = time.perf_counter()
+        manager.charm._render_published_config(redirects)
+        cold = time.perf_counter() - start
+        manager.charm._render_cache.save()
+
+    # A release touching a handful of lines.
+    for i in range(0, size // 2, size // 10):
+        redirects[f"/legacy/section-{i % 97}/page-{i}"] = f"/moved/page-{i}"
+    redirects["/brand-new"] = "/docs/brand-new"
+
+    with ctx(ctx.on.update_status(), testing.State(leader=True, config=config)) as manager:
+        start = time.perf_counter()
+        manager.charm._render_published_config(redirects)
+        warm = time.perf_counter() - start
+
+    logger.info(
+        "%d entries: cold render %.1fms, warm render %.1fms", size, cold * 1000, warm * 1000
+    )
+    assert warm < cold
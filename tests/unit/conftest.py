@@ -0,0 +1,19 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+import ops
+import pytest
+from scenario.mocking import _MockModelBackend
+
+
+@pytest.fixture(autouse=True)
+def unattached_resources_raise_model_error(monkeypatch):
+    """Make Scenario behave like Juju when a declared resource was never attached."""
+    resource_get = _MockModelBackend.resource_get
+
+    def _resource_get(self, resource_name: str) -> str:
+        if not any(resource.name == resource_name for resource in self._state.resources):
+            raise ops.ModelError(f"resource {resource_name} not attached")
+        return resource_get(self, resource_name)
+
+    monkeypatch.setattr(_MockModelBackend, "resource_get", _resource_get)
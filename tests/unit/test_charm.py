@@ -3,24 +3,49 @@
 #
 # Learn more about testing at: https://juju.is/docs/sdk/testing
 
+import json
+
+import ops
+import pytest
 import yaml
 from ops import testing
 
-from charm import RELATION_NAME, TraefikK8SPathRedirectorCharm
+import redirect_maps
+from charm import RELATION_NAME, RENDER_CACHE_FILE, TraefikK8SPathRedirectorCharm
+from route_evaluator import RouteIndex
 
 
 def test_waiting_without_relation():
     ctx = testing.Context(TraefikK8SPathRedirectorCharm)
-    state_in = testing.State(config={"direct_path_redirects": "{'/from': '/to'}"})
+    state_in = testing.State(leader=True, config={"direct_path_redirects": "{'/from': '/to'}"})
 
     state_out = ctx.run(ctx.on.config_changed(), state_in)
 
-    assert isinstance(state_out.unit_status, testing.WaitingStatus)
+    assert state_out.unit_status == testing.WaitingStatus("waiting for traefik-route relation")
+
+
+def test_non_leader_skips_loading_the_map(monkeypatch):
+    def _parse(value, name, report):
+        raise AssertionError("non-leader parsed the redirect map")
+
+    monkeypatch.setattr(redirect_maps, "parse_redirect_map", _parse)
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    state_in = testing.State(
+        relations={relation}, config={"direct_path_redirects": "{'/from': '/to'}"}
+    )
+
+    state_out = ctx.run(ctx.on.relation_changed(relation), state_in)
+
+    assert state_out.unit_status == testing.WaitingStatus("waiting for leader")
+    assert "config" not in state_out.get_relation(relation.id).local_app_data
 
 
 def test_invalid_config_blocks():
     ctx = testing.Context(TraefikK8SPathRedirectorCharm)
-    state_in = testing.State(config={"direct_path_redirects": "{'from': '/to'}"})
+    state_in = testing.State(leader=True, config={"direct_path_redirects": "{'from': '/to'}"})
 
     state_out = ctx.run(ctx.on.config_changed(), state_in)
 
@@ -49,19 +74,19 @@ def test_relation_data_published():
     router = route_config["http"]["routers"][router_name]
     tls_router = route_config["http"]["routers"][tls_router_name]
     middleware = route_config["http"]["middlewares"][middleware_name]
-    assert router["rule"] == "PathPrefix(`/from`)"
+    assert router["rule"] == "Path(`/from`)"
     assert router["middlewares"] == [middleware_name]
-    assert tls_router["rule"] == "PathPrefix(`/from`)"
+    assert tls_router["rule"] == "Path(`/from`)"
     assert tls_router["middlewares"] == [middleware_name]
     assert middleware["redirectRegex"]["regex"] == "^(https?://[^/]+)/from$"
     assert middleware["redirectRegex"]["replacement"] == "${1}/to"
     assert relation_out.local_app_data["raw"] == "True"
-    assert state_out.unit_status == testing.ActiveStatus()
+    assert isinstance(state_out.unit_status, testing.ActiveStatus)
 
 
 def test_regex_from_path_allowed():
     ctx = testing.Context(TraefikK8SPathRedirectorCharm)
-    state_in = testing.State(config={"direct_path_redirects": "{}"})
+    state_in = testing.State(leader=True, config={"direct_path_redirects": "{}"})
 
     state_out = ctx.run(ctx.on.config_changed(), state_in)
 
@@ -89,3 +114,768 @@ def test_absolute_url_to_path_allowed():
     middleware_name = "traefik-k8s-path-redirector-path-redirect-0-middleware"
     middleware = route_config["http"]["middlewares"][middleware_name]
     assert middleware["redirectRegex"]["replacement"] == "https://ubuntu.net/hello"
+
+
+def test_compact_layout_groups_by_target():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    state_in = testing.State(
+        leader=True,
+        relations={relation},
+        config={
+            "direct_path_redirects": "{'/a': '/to', '/b': '/to', '/c': 'https://ubuntu.net/'}",
+            "redirect_layout": "compact",
+        },
+    )
+
+    state_out = ctx.run(ctx.on.relation_created(relation), state_in)
+
+    route_config = yaml.safe_load(state_out.get_relation(relation.id).local_app_data["config"])
+    routers = route_config["http"]["routers"]
+    middlewares = route_config["http"]["middlewares"]
+    assert set(routers) == {
+        "traefik-k8s-path-redirector-path-redirect",
+        "traefik-k8s-path-redirector-path-redirect-tls",
+    }
+    router = routers["traefik-k8s-path-redirector-path-redirect"]
+    assert router["rule"] == "Path(`/a`) || Path(`/b`) || Path(`/c`)"
+    assert router["middlewares"] == sorted(middlewares)
+    grouped = middlewares["traefik-k8s-path-redirector-path-redirect-target-0-middleware"]
+    assert grouped["redirectRegex"]["regex"] == "^(https?://[^/]+)(?:/a|/b)$"
+    assert grouped["redirectRegex"]["replacement"] == "${1}/to"
+
+
+def test_unknown_layout_blocks():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    state_in = testing.State(
+        leader=True,
+        config={"direct_path_redirects": "{'/from': '/to'}", "redirect_layout": "sparse"},
+    )
+
+    state_out = ctx.run(ctx.on.config_changed(), state_in)
+
+    assert isinstance(state_out.unit_status, testing.BlockedStatus)
+    assert "redirect_layout" in state_out.unit_status.message
+
+
+def test_unchanged_config_skips_publish(monkeypatch):
+    submitted = []
+    original_publish = TraefikK8SPathRedirectorCharm._publish
+
+    def _publish(self, relation, config):
+        submitted.append(config)
+        original_publish(self, relation, config)
+
+    monkeypatch.setattr(TraefikK8SPathRedirectorCharm, "_publish", _publish)
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    state_in = testing.State(
+        leader=True,
+        relations={relation},
+        config={"direct_path_redirects": "{'/from': '/to'}"},
+    )
+
+    state_out = ctx.run(ctx.on.relation_created(relation), state_in)
+    state_out = ctx.run(ctx.on.config_changed(), state_out)
+
+    assert len(submitted) == 1
+    assert isinstance(state_out.unit_status, testing.ActiveStatus)
+
+    changed = testing.State(
+        leader=True,
+        relations=state_out.relations,
+        stored_states=state_out.stored_states,
+        config={"direct_path_redirects": "{'/from': '/elsewhere'}"},
+    )
+    ctx.run(ctx.on.config_changed(), changed)
+
+    assert len(submitted) == 2
+
+
+def test_hash_naming_is_independent_of_order():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+
+    def _routers(redirects):
+        state_in = testing.State(
+            leader=True,
+            relations={relation},
+            config={"direct_path_redirects": redirects, "router_naming": "hash"},
+        )
+        state_out = ctx.run(ctx.on.relation_created(relation), state_in)
+        config = yaml.safe_load(state_out.get_relation(relation.id).local_app_data["config"])
+        return config["http"]["routers"]
+
+    before = _routers("{'/b': '/to'}")
+    after = _routers("{'/a': '/to', '/b': '/to'}")
+
+    assert set(before) < set(after)
+    assert len(after) == 4
+    for name, router in before.items():
+        assert after[name] == router
+
+
+def test_json_config_published_compactly():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    state_in = testing.State(
+        leader=True,
+        relations={relation},
+        config={"direct_path_redirects": '{"/from": "/to", "/docs": "https://ubuntu.net/docs"}'},
+    )
+
+    state_out = ctx.run(ctx.on.relation_created(relation), state_in)
+
+    published = state_out.get_relation(relation.id).local_app_data["config"]
+    assert "\n" not in published
+    middlewares = yaml.safe_load(published)["http"]["middlewares"]
+    middleware = middlewares["traefik-k8s-path-redirector-path-redirect-1-middleware"]
+    assert middleware["redirectRegex"]["replacement"] == "https://ubuntu.net/docs"
+
+
+def test_redirect_map_resource_merged_with_option(tmp_path):
+    redirect_map = tmp_path / "redirect-map"
+    redirect_map.write_text("# source,target\n/a,/from-resource\n/b,/from-resource\n")
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    state_in = testing.State(
+        leader=True,
+        relations={relation},
+        resources={testing.Resource(name="redirect-map", path=redirect_map)},
+        config={"direct_path_redirects": "{'/b': '/from-option'}"},
+    )
+
+    state_out = ctx.run(ctx.on.relation_created(relation), state_in)
+
+    route_config = yaml.safe_load(state_out.get_relation(relation.id).local_app_data["config"])
+    replacements = [
+        middleware["redirectRegex"]["replacement"]
+        for middleware in route_config["http"]["middlewares"].values()
+    ]
+    assert replacements == ["${1}/from-resource", "${1}/from-option"]
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        '{"/a": "/b"}\n',
+        "{'/a': '/b'}\n",
+        "---\n/a: /b\n",
+        "%YAML 1.2\n---\n/a: /b\n",
+        "# comment\n/a,/b\n",
+    ],
+)
+def test_redirect_map_resource_formats(tmp_path, content):
+    redirect_map = tmp_path / "redirect-map"
+    redirect_map.write_text(content)
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    state_in = testing.State(
+        leader=True,
+        relations={relation},
+        resources={testing.Resource(name="redirect-map", path=redirect_map)},
+    )
+
+    state_out = ctx.run(ctx.on.relation_created(relation), state_in)
+
+    assert state_out.unit_status == testing.ActiveStatus("1 redirect, 0.5 KiB published")
+
+
+def test_non_utf8_redirect_map_resource_blocks(tmp_path):
+    redirect_map = tmp_path / "redirect-map"
+    redirect_map.write_bytes("/a,/caf\N{LATIN SMALL LETTER E WITH ACUTE}\n".encode("latin-1"))
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    state_in = testing.State(
+        leader=True, resources={testing.Resource(name="redirect-map", path=redirect_map)}
+    )
+
+    state_out = ctx.run(ctx.on.config_changed(), state_in)
+
+    assert state_out.unit_status == testing.BlockedStatus(
+        "redirect-map resource must be UTF-8 text: invalid continuation byte at byte 7"
+    )
+
+
+def test_invalid_redirect_map_resource_blocks(tmp_path):
+    redirect_map = tmp_path / "redirect-map"
+    redirect_map.write_text("/a,/b,/c\n")
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    state_in = testing.State(
+        leader=True,
+        resources={testing.Resource(name="redirect-map", path=redirect_map)},
+        config={"direct_path_redirects": "{'/from': '/to'}"},
+    )
+
+    state_out = ctx.run(ctx.on.config_changed(), state_in)
+
+    assert isinstance(state_out.unit_status, testing.BlockedStatus)
+    assert "redirect-map resource" in state_out.unit_status.message
+
+
+def test_compressed_redirects_share_one_rule():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    state_in = testing.State(
+        leader=True,
+        relations={relation},
+        config={
+            "direct_path_redirects": '{"/v1/a": "/latest/a", "/v1/b": "/latest/b", "/x": "/y"}',
+            "compress_redirects": True,
+        },
+    )
+
+    state_out = ctx.run(ctx.on.relation_created(relation), state_in)
+
+    route_config = yaml.safe_load(state_out.get_relation(relation.id).local_app_data["config"])
+    routers = route_config["http"]["routers"]
+    group_router = routers["traefik-k8s-path-redirector-path-redirect-group-0"]
+    assert group_router["rule"] == "Path(`/v1/a`) || Path(`/v1/b`)"
+    assert len(routers) == 4
+    assert len(route_config["http"]["middlewares"]) == 2
+
+
+def test_shared_middleware_layout_dedupes_targets():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    state_in = testing.State(
+        leader=True,
+        relations={relation},
+        config={
+            "direct_path_redirects": '{"/a": "https://ubuntu.net/", "/b": "https://ubuntu.net/"}',
+            "redirect_layout": "shared-middleware",
+        },
+    )
+
+    state_out = ctx.run(ctx.on.relation_created(relation), state_in)
+
+    route_config = yaml.safe_load(state_out.get_relation(relation.id).local_app_data["config"])
+    routers = route_config["http"]["routers"]
+    middlewares = route_config["http"]["middlewares"]
+    assert len(routers) == 4
+    assert list(middlewares) == ["traefik-k8s-path-redirector-path-redirect-target-0-middleware"]
+    assert {tuple(router["middlewares"]) for router in routers.values()} == {tuple(middlewares)}
+    shared = middlewares["traefik-k8s-path-redirector-path-redirect-target-0-middleware"]
+    assert shared["redirectRegex"]["regex"] == "^(https?://[^/]+)(?:/a|/b)$"
+
+
+def test_repeated_reconcile_in_one_dispatch_renders_once(monkeypatch):
+    calls = {"parse": [], "render": 0}
+    original_parse = redirect_maps.parse_redirect_map
+    original_render = TraefikK8SPathRedirectorCharm._render_published_config
+
+    def _parse(value, name, report):
+        calls["parse"].append(name)
+        return original_parse(value, name, report)
+
+    def _render(self, direct_redirects, shard=""):
+        calls["render"] += 1
+        return original_render(self, direct_redirects, shard)
+
+    monkeypatch.setattr(redirect_maps, "parse_redirect_map", _parse)
+    monkeypatch.setattr(TraefikK8SPathRedirectorCharm, "_render_published_config", _render)
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    state_in = testing.State(
+        leader=True,
+        relations={relation},
+        config={"direct_path_redirects": "{'/from': '/to'}"},
+    )
+
+    with ctx(ctx.on.relation_created(relation), state_in) as manager:
+        manager.charm._stored.published_fingerprints = {}
+        manager.charm._on_reconcile(ops.EventBase(None))
+        manager.charm._stored.published_fingerprints = {}
+        manager.charm._on_reconcile(ops.EventBase(None))
+        state_out = manager.run()
+
+    assert calls == {"parse": ["direct_path_redirects", "prefix_path_redirects"], "render": 1}
+    assert isinstance(state_out.unit_status, testing.ActiveStatus)
+
+
+def test_redirect_cycle_blocks():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    state_in = testing.State(
+        leader=True, config={"direct_path_redirects": '{"/b": "/a", "/a": "/b"}'}
+    )
+
+    state_out = ctx.run(ctx.on.config_changed(), state_in)
+
+    assert state_out.unit_status == testing.BlockedStatus("redirect cycle: /a -> /b -> /a")
+
+
+def test_analyze_redirects_action():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    state_in = testing.State(
+        config={
+            "direct_path_redirects": json.dumps(
+                {
+                    "/old": "/mid",
+                    "/mid": "/new",
+                    "/dup": "/x",
+                    "/dup/": "/x",
+                    "/blog/keep": "/kept",
+                }
+            ),
+            "prefix_path_redirects": json.dumps({"/blog": "/news"}),
+        }
+    )
+
+    ctx.run(ctx.on.action("analyze-redirects"), state_in)
+
+    assert ctx.action_results["redirects"] == 6
+    assert ctx.action_results["chains"]["count"] == 1
+    assert json.loads(ctx.action_results["chains"]["findings"]) == [["/old", 2, "/new"]]
+    assert json.loads(ctx.action_results["duplicates"]["findings"]) == [["/dup", "/dup/"]]
+    assert ctx.action_results["cycles"]["count"] == 0
+    # Exact redirects below a prefix win over it, so they are not shadowed.
+    assert ctx.action_results["shadowed"]["count"] == 0
+
+
+def test_reconcile_profiles_action():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    state = testing.State(
+        leader=True,
+        relations={relation},
+        config={"direct_path_redirects": '{"/a": "/b", "/c": "/d"}'},
+    )
+
+    state = ctx.run(ctx.on.relation_created(relation), state)
+    first_status = state.unit_status
+    state = ctx.run(ctx.on.config_changed(), state)
+    ctx.run(ctx.on.action("reconcile-profiles", params={"limit": 5}), state)
+
+    # Timings are only reported by the action, so a no-op reconcile keeps the status.
+    assert (
+        state.unit_status == first_status == testing.ActiveStatus("2 redirects, 1.0 KiB published")
+    )
+    assert ctx.action_results["count"] == 2
+    first, second = json.loads(ctx.action_results["profiles"])
+    assert first["event"] == "RelationCreatedEvent"
+    assert (first["entries"], first["routers"], first["middlewares"]) == (2, 4, 2)
+    config = state.get_relation(relation.id).local_app_data["config"]
+    assert first["bytes"] == len(config.encode())
+    assert set(first["ms"]) == {"parse", "validate", "render", "publish", "total"}
+    # The unchanged map is neither rendered nor published again.
+    assert "routers" not in second
+    assert second["ms"]["render"] == second["ms"]["publish"] == 0
+
+
+def test_test_redirect_action():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    state_in = testing.State(
+        config={
+            "direct_path_redirects": json.dumps(
+                {"/old": "/mid", "/mid": "/new", "docs.example.com": {"/old": "/docs"}}
+            ),
+            "router_priority_base": 100,
+        }
+    )
+
+    urls = "http://example.com/old, https://docs.example.com/old http://example.com/none"
+    ctx.run(ctx.on.action("test-redirect", params={"urls": urls}), state_in)
+
+    assert (ctx.action_results["count"], ctx.action_results["redirected"]) == (3, 2)
+    chained, scoped, unmatched = json.loads(ctx.action_results["results"])
+    assert (chained["target"], chained["hops"]) == ("http://example.com/new", 2)
+    assert scoped["target"] == "https://docs.example.com/docs"
+    assert scoped["router"].endswith("-tls")
+    assert unmatched == {
+        "url": "http://example.com/none",
+        "target": None,
+        "hops": 0,
+        "router": None,
+        "loop": False,
+        "relation": None,
+    }
+
+
+def test_test_redirect_action_evaluates_the_planned_layout():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    redirects = {f"/old/{i}": "/new" for i in range(20)}
+    state_in = testing.State(
+        relations={relation},
+        config={"direct_path_redirects": json.dumps(redirects), "redirect_layout": "auto"},
+    )
+
+    ctx.run(ctx.on.action("test-redirect", params={"urls": "http://example.com/old/3"}), state_in)
+
+    (result,) = json.loads(ctx.action_results["results"])
+    assert result["target"] == "http://example.com/new"
+    # The planner picks the compact layout, whose single router serves every source.
+    assert result["router"] == "traefik-k8s-path-redirector-path-redirect"
+    assert result["relation"] == relation.id
+
+
+def test_flattened_chains_redirect_in_one_hop():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    state_in = testing.State(
+        leader=True,
+        relations={relation},
+        config={
+            "direct_path_redirects": '{"/old": "/mid", "/mid": "/new"}',
+            "flatten_redirect_chains": True,
+        },
+    )
+
+    state_out = ctx.run(ctx.on.relation_created(relation), state_in)
+
+    route_config = yaml.safe_load(state_out.get_relation(relation.id).local_app_data["config"])
+    replacements = [
+        middleware["redirectRegex"]["replacement"]
+        for middleware in route_config["http"]["middlewares"].values()
+    ]
+    assert replacements == ["${1}/new", "${1}/new"]
+
+
+def test_router_priorities_rank_specific_paths_higher():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    state_in = testing.State(
+        leader=True,
+        relations={relation},
+        config={
+            "direct_path_redirects": '{"/docs/install": "/a", "/docs": "/b", "/faq": "/c"}',
+            "router_priority_base": 1000,
+        },
+    )
+
+    state_out = ctx.run(ctx.on.relation_created(relation), state_in)
+
+    route_config = yaml.safe_load(state_out.get_relation(relation.id).local_app_data["config"])
+    priorities = {
+        name: router["priority"] for name, router in route_config["http"]["routers"].items()
+    }
+    prefix = "traefik-k8s-path-redirector-path-redirect"
+    assert priorities == {
+        f"{prefix}-0": 1002,
+        f"{prefix}-0-tls": 1002,
+        f"{prefix}-1": 1001,
+        f"{prefix}-1-tls": 1001,
+        f"{prefix}-2": 1000,
+        f"{prefix}-2-tls": 1000,
+    }
+
+
+def test_prefix_redirects_carry_over_the_rest_of_the_url():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    state_in = testing.State(
+        leader=True,
+        relations={relation},
+        config={
+            "direct_path_redirects": '{"/blog/keep": "/kept"}',
+            "prefix_path_redirects": json.dumps(
+                {"/blog/": "/news", "docs.example.com": {"/v1": "https://example.com/docs"}}
+            ),
+        },
+    )
+
+    with ctx(ctx.on.relation_created(relation), state_in) as manager:
+        state_out = manager.run()
+        index = RouteIndex(manager.charm._build_traefik_config(manager.charm._shards[relation.id]))
+
+    route_config = yaml.safe_load(state_out.get_relation(relation.id).local_app_data["config"])
+    prefix = "traefik-k8s-path-redirector-path-prefix-redirect"
+    router = route_config["http"]["routers"][f"{prefix}-1"]
+    assert router["rule"] == "PathPrefix(`/blog/`) || Path(`/blog`)"
+    assert router["priority"] == len("Path(`/blog`)")
+    assert route_config["http"]["middlewares"][f"{prefix}-1-middleware"]["redirectRegex"] == {
+        "regex": r"^(https?://[^/]+)/blog(/[^?]*)?(\?.*)?$",
+        "replacement": "${1}/news${2}${3}",
+        "permanent": True,
+    }
+    assert route_config["http"]["routers"][f"{prefix}-2-tls"]["rule"] == (
+        "Host(`docs.example.com`) && (PathPrefix(`/v1/`) || Path(`/v1`))"
+    )
+
+    def target(url):
+        return index.evaluate(url).target
+
+    assert target("http://example.com/blog") == "http://example.com/news"
+    assert (
+        target("http://example.com/blog/2020/a?page=2") == "http://example.com/news/2020/a?page=2"
+    )
+    assert target("http://example.com/blogger") is None
+    assert target("http://example.com/blog/keep") == "http://example.com/kept"
+    assert target("https://docs.example.com/v1/install") == "https://example.com/docs/install"
+
+
+@pytest.mark.parametrize(
+    "config, message",
+    [
+        (
+            {"direct_path_redirects": '{"/a": "/b"}', "prefix_path_redirects": '{"/a": "/c"}'},
+            "prefix_path_redirects sources must not also be in direct_path_redirects: /a -> /c",
+        ),
+        (
+            {"prefix_path_redirects": '{"/docs": "/docs/latest"}'},
+            "targets must not be inside their source's subtree: /docs -> /docs/latest",
+        ),
+        (
+            {
+                "prefix_path_redirects": json.dumps(
+                    {"a.example.com": {"/": "https://a.example.com/x"}}
+                )
+            },
+            "subtree: a.example.com/ -> https://a.example.com/x",
+        ),
+    ],
+)
+def test_invalid_prefix_redirects_block(config, message):
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    state_in = testing.State(leader=True, config=config)
+
+    state_out = ctx.run(ctx.on.config_changed(), state_in)
+
+    assert isinstance(state_out.unit_status, testing.BlockedStatus)
+    assert message in state_out.unit_status.message
+
+
+def test_auto_layout_publishes_smallest_layout():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    redirects = {f"/old/{i}": "/new" for i in range(20)}
+    state_in = testing.State(
+        leader=True,
+        relations={relation},
+        config={"direct_path_redirects": json.dumps(redirects), "redirect_layout": "auto"},
+    )
+
+    state_out = ctx.run(ctx.on.relation_created(relation), state_in)
+
+    route_config = yaml.safe_load(state_out.get_relation(relation.id).local_app_data["config"])
+    assert list(route_config["http"]["routers"]) == [
+        "traefik-k8s-path-redirector-path-redirect",
+        "traefik-k8s-path-redirector-path-redirect-tls",
+    ]
+    assert isinstance(state_out.unit_status, testing.ActiveStatus)
+
+
+def test_config_over_budget_blocks_without_publishing():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    state_in = testing.State(
+        leader=True,
+        relations={relation},
+        config={
+            "direct_path_redirects": json.dumps({f"/old/{i}": f"/new/{i}" for i in range(20)}),
+            "redirect_layout": "auto",
+            "max_traefik_objects": 2,
+        },
+    )
+
+    state_out = ctx.run(ctx.on.relation_created(relation), state_in)
+
+    assert "config" not in state_out.get_relation(relation.id).local_app_data
+    assert state_out.unit_status == testing.BlockedStatus(
+        f"config for relation {relation.id} does not fit: compact, compressed renders "
+        "1.3 KiB and 3 objects, over the budget of 2 objects"
+    )
+
+
+def test_host_scoped_redirects():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    state_in = testing.State(
+        leader=True,
+        relations={relation},
+        config={
+            "direct_path_redirects": json.dumps({"Docs.Example.com": {"/a": "/b"}, "/c": "/d"}),
+        },
+    )
+
+    state_out = ctx.run(ctx.on.relation_created(relation), state_in)
+
+    route_config = yaml.safe_load(state_out.get_relation(relation.id).local_app_data["config"])
+    prefix = "traefik-k8s-path-redirector-path-redirect"
+    router = route_config["http"]["routers"][f"{prefix}-0"]
+    middleware = route_config["http"]["middlewares"][f"{prefix}-0-middleware"]
+    assert router["rule"] == "Host(`docs.example.com`) && Path(`/a`)"
+    assert middleware["redirectRegex"]["regex"] == (
+        r"^(https?://docs\.example\.com(?::[0-9]+)?)/a$"
+    )
+    assert route_config["http"]["routers"][f"{prefix}-1"]["rule"] == "Path(`/c`)"
+
+
+def test_invalid_host_blocks():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    state_in = testing.State(
+        leader=True, config={"direct_path_redirects": json.dumps({"bad host!": {"/a": "/b"}})}
+    )
+
+    state_out = ctx.run(ctx.on.config_changed(), state_in)
+
+    assert state_out.unit_status == testing.BlockedStatus(
+        "direct_path_redirects host keys must be valid hostnames: bad host!/a -> /b"
+    )
+
+
+def test_every_invalid_entry_is_reported_in_one_pass():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    state_in = testing.State(
+        leader=True,
+        config={
+            "direct_path_redirects": json.dumps(
+                {"old": "/new", "/ok": "/fine", "/a b": "/c", "/d": "e"}
+            ),
+            "prefix_path_redirects": '{"/docs": "/docs/latest"}',
+        },
+    )
+
+    state_out = ctx.run(ctx.on.config_changed(), state_in)
+    ctx.run(ctx.on.action("validate-redirects", params={"limit": 3}), state_in)
+
+    assert state_out.unit_status == testing.BlockedStatus(
+        "4 invalid entries, first: direct_path_redirects keys must start with '/': "
+        "old -> /new; run the validate-redirects action for all of them"
+    )
+    assert ctx.action_results["count"] == 4
+    issues = json.loads(ctx.action_results["issues"])
+    assert [(issue["name"], issue["source"]) for issue in issues] == [
+        ("direct_path_redirects", "old"),
+        ("direct_path_redirects", "/a b"),
+        ("direct_path_redirects", "/d"),
+    ]
+
+
+def test_https_entrypoint_renders_only_tls_routers():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    state_in = testing.State(
+        leader=True,
+        relations={relation},
+        config={
+            "direct_path_redirects": '{"/a": "/b", "/c": "/d"}',
+            "redirect_entrypoints": "https",
+        },
+    )
+
+    state_out = ctx.run(ctx.on.relation_created(relation), state_in)
+
+    route_config = yaml.safe_load(state_out.get_relation(relation.id).local_app_data["config"])
+    routers = route_config["http"]["routers"]
+    assert sorted(routers) == [
+        "traefik-k8s-path-redirector-path-redirect-0-tls",
+        "traefik-k8s-path-redirector-path-redirect-1-tls",
+    ]
+    for router in routers.values():
+        assert router["entryPoints"] == ["websecure"]
+        assert router["tls"] == {}
+
+
+def test_redirects_sharded_across_relations():
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm)
+    relations = [
+        testing.Relation(
+            endpoint=RELATION_NAME, interface="traefik_route", remote_app_name=f"traefik-{i}"
+        )
+        for i in range(2)
+    ]
+    hosts = {f"app{i}.example.com": {"/a": "/b"} for i in range(20)}
+    state_in = testing.State(
+        leader=True,
+        relations=set(relations),
+        config={"direct_path_redirects": json.dumps({**hosts, "/shared": "/everywhere"})},
+    )
+
+    state_out = ctx.run(ctx.on.relation_created(relations[0]), state_in)
+
+    rules_per_relation = []
+    for relation in relations:
+        config = state_out.get_relation(relation.id).local_app_data["config"]
+        routers = yaml.safe_load(config)["http"]["routers"].values()
+        rules_per_relation.append({router["rule"] for router in routers})
+    assert all("Path(`/shared`)" in rules for rules in rules_per_relation)
+    host_rules = [rules - {"Path(`/shared`)"} for rules in rules_per_relation]
+    assert all(host_rules)
+    assert not host_rules[0] & host_rules[1]
+    assert len(host_rules[0] | host_rules[1]) == 20
+
+
+def test_render_reuses_fragments_of_unchanged_entries(tmp_path, caplog):
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm, charm_root=tmp_path)
+    relation = testing.Relation(
+        endpoint=RELATION_NAME, interface="traefik_route", remote_app_name="traefik-k8s"
+    )
+    redirects = {"/a": "/b", "/c": "/d", "/e": "/f"}
+    config = {"direct_path_redirects": json.dumps(redirects), "router_naming": "hash"}
+    ctx.run(
+        ctx.on.config_changed(), testing.State(leader=True, relations={relation}, config=config)
+    )
+
+    caplog.clear()
+    edited = {"/a": "/b", "/c": "/changed", "/e": "/f", "/g": "/h"}
+    config["direct_path_redirects"] = json.dumps(edited)
+    state_out = ctx.run(
+        ctx.on.config_changed(), testing.State(leader=True, relations={relation}, config=config)
+    )
+
+    assert "rendered 2 redirects, reused 2 from the previous render" in caplog.text
+    published = state_out.get_relation(relation.id).local_app_data["config"]
+    with ctx(ctx.on.update_status(), testing.State(leader=True, config=config)) as manager:
+        assert json.loads(published) == manager.charm._build_traefik_config(edited)
+
+
+def test_render_cache_keeps_fragments_of_shards_not_rendered(tmp_path):
+    ctx = testing.Context(TraefikK8SPathRedirectorCharm, charm_root=tmp_path)
+    relations = {
+        testing.Relation(
+            endpoint=RELATION_NAME, interface="traefik_route", remote_app_name=f"traefik-{i}"
+        )
+        for i in range(2)
+    }
+    hosts = {f"app{i}.example.com": {"/a": "/b", "/c": "/d"} for i in range(20)}
+    config = {"direct_path_redirects": json.dumps(hosts), "router_naming": "hash"}
+    ctx.run(
+        ctx.on.config_changed(), testing.State(leader=True, relations=relations, config=config)
+    )
+
+    # Editing one host only re-renders the shard it is in.
+    hosts["app0.example.com"]["/c"] = "/changed"
+    config["direct_path_redirects"] = json.dumps(hosts)
+    ctx.run(
+        ctx.on.config_changed(), testing.State(leader=True, relations=relations, config=config)
+    )
+
+    cache = json.loads((tmp_path / RENDER_CACHE_FILE).read_text())
+    assert set(cache["shards"]) == {str(relation.id) for relation in relations}
+    assert sum(len(fragments) for fragments in cache["shards"].values()) == 40
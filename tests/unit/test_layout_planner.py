@@ -0,0 +1,61 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+from layout_planner import Budget, LayoutPlan, layout_candidates, plan_layout
+
+
+def _plan(layout, config_bytes, objects, chain=1):
+    options = {
+        "redirect_layout": layout,
+        "compress_redirects": False,
+        "redirect_entrypoints": "all",
+    }
+    return LayoutPlan(options, "", config_bytes, objects, 0, chain)
+
+
+def test_https_only_candidates_need_opt_in():
+    def entrypoints(candidates):
+        return {candidate["redirect_entrypoints"] for candidate in candidates}
+
+    assert len(layout_candidates({"redirect_entrypoints": "all"}, False)) == 6
+    assert entrypoints(layout_candidates({"redirect_entrypoints": "all"}, False)) == {"all"}
+    assert entrypoints(layout_candidates({"redirect_entrypoints": "all"}, True)) == {
+        "all",
+        "https",
+    }
+    assert entrypoints(layout_candidates({"redirect_entrypoints": "http"}, True)) == {"http"}
+    compressed = layout_candidates({"compress_redirects": True}, False)
+    assert all(candidate["compress_redirects"] for candidate in compressed)
+
+
+def test_smallest_plan_within_budget_wins():
+    plans = {"per-entry": _plan("per-entry", 900, 30), "compact": _plan("compact", 500, 40)}
+
+    def render(options):
+        return plans[options["redirect_layout"]]
+
+    candidates = [{"redirect_layout": layout} for layout in plans]
+    assert plan_layout(render, candidates, Budget()).name == "compact"
+    assert plan_layout(render, candidates, Budget(max_objects=35)).name == "per-entry"
+
+    budget = Budget(max_bytes=400)
+    plan = plan_layout(render, candidates, budget)
+    assert not budget.admits(plan)
+    assert budget.describe_excess(plan) == (
+        "compact renders 0.5 KiB and 40 objects, over the budget of 0.4 KiB"
+    )
+
+
+def test_shorter_middleware_chain_within_budget_wins():
+    plans = {
+        "per-entry": _plan("per-entry", 900, 30),
+        "shared-middleware": _plan("shared-middleware", 800, 25),
+        "compact": _plan("compact", 500, 12, chain=10),
+    }
+
+    def render(options):
+        return plans[options["redirect_layout"]]
+
+    candidates = [{"redirect_layout": layout} for layout in plans]
+    assert plan_layout(render, candidates, Budget()).name == "shared-middleware"
+    assert plan_layout(render, candidates, Budget(max_bytes=600)).name == "compact"
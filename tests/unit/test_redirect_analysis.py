@@ -0,0 +1,122 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+from redirect_analysis import (
+    analyze_redirects,
+    find_cycles,
+    find_shadowed,
+    flatten_chains,
+    normalize_path,
+)
+
+
+def test_normalize_path():
+    assert normalize_path("//docs///v1/") == "/docs/v1"
+    assert normalize_path("/") == "/"
+    assert normalize_path("//") == "/"
+
+
+def test_find_cycles_reports_each_loop_once():
+    redirects = {"/c": "/a", "/a": "/b", "/b": "/c", "/x": "/a", "/self": "/self", "/ok": "/y"}
+
+    assert find_cycles(redirects) == [["/a", "/b", "/c"], ["/self"]]
+
+
+def test_find_shadowed_only_reports_sources_the_prefix_outranks():
+    sources = ["/blog/x", "/blogger", "/docs/2020/post", "/docs", "docs.example.com/a"]
+    prefixes = ["/blog", "docs.example.com/docs", "/"]
+
+    assert find_shadowed(sources + prefixes, prefixes) == [
+        ("docs.example.com/docs", "/docs"),
+        ("docs.example.com/docs", "/docs/2020/post"),
+    ]
+    assert find_shadowed(sources + prefixes, prefixes, ranked=True) == [
+        ("docs.example.com/docs", "/docs")
+    ]
+
+
+def test_chain_into_cycle_stops_at_cycle():
+    report = analyze_redirects({"/start": "/a", "/a": "/b", "/b": "/a"})
+
+    assert report.cycles == [["/a", "/b"]]
+    assert report.chains == [("/start", 1, "/a")]
+
+
+def test_flatten_chains_points_sources_at_final_target():
+    redirects = {"/a": "/b", "/b": "/c", "/c": "https://ubuntu.net/", "/x": "/y"}
+
+    flattened, rewritten = flatten_chains(redirects)
+
+    assert flattened == {
+        "/a": "https://ubuntu.net/",
+        "/b": "https://ubuntu.net/",
+        "/c": "https://ubuntu.net/",
+        "/x": "/y",
+    }
+    assert rewritten == [("/a", "/b", "https://ubuntu.net/"), ("/b", "/c", "https://ubuntu.net/")]
+
+
+def test_flatten_chains_leaves_cycles_alone():
+    redirects = {"/loop-a": "/loop-b", "/loop-b": "/loop-a", "/in": "/mid", "/mid": "/loop-a"}
+
+    flattened, _ = flatten_chains(redirects)
+
+    assert flattened == {
+        "/loop-a": "/loop-b",
+        "/loop-b": "/loop-a",
+        "/in": "/loop-a",
+        "/mid": "/loop-a",
+    }
+
+
+def test_chains_follow_host_scoped_sources():
+    redirects = {
+        "docs.example.com/a": "/b",
+        "docs.example.com/b": "/c",
+        "/b": "/elsewhere",
+        "/x": "https://docs.example.com/a",
+    }
+
+    report = analyze_redirects(redirects)
+    flattened, _ = flatten_chains(redirects)
+
+    assert report.chains == [("/x", 3, "/c")]
+    assert flattened["docs.example.com/a"] == "/c"
+    assert flattened["/x"] == "https://docs.example.com/a"
+
+
+def test_walks_keep_the_request_host_through_unscoped_hops():
+    redirects = {
+        "docs.example.com/a": "/b",
+        "/b": "/c",
+        "docs.example.com/c": "/d",
+        "/c": "/e",
+    }
+
+    flattened, _ = flatten_chains(redirects)
+
+    assert flattened["docs.example.com/a"] == "/d"
+    assert flattened["/b"] == "/c"
+    assert analyze_redirects(redirects).chains == [("docs.example.com/a", 3, "/d")]
+    assert find_cycles({"x.com/a": "/b", "/b": "/a"}) == [["/b", "x.com/a"]]
+
+
+def test_unscoped_sources_are_not_flattened_through_host_scoped_paths():
+    redirects = {"/v1": "/b", "x.com/b": "/c/latest/b", "/b": "https://x.com/a/a"}
+
+    flattened, rewritten = flatten_chains(redirects)
+
+    assert flattened == redirects
+    assert rewritten == []
+
+
+def test_chains_sharing_a_tail_are_found_in_linear_time():
+    length = 5000
+    redirects = {f"/tail/{i}": f"/tail/{i + 1}" for i in range(length)}
+    redirects.update({f"/head/{i}": f"/tail/{i}" for i in range(length)})
+
+    chains = analyze_redirects(redirects).chains
+
+    assert len(chains) == length
+    assert chains[0] == ("/head/0", length + 1, f"/tail/{length}")
+    assert chains[-1] == (f"/head/{length - 1}", 2, f"/tail/{length}")
@@ -0,0 +1,47 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+import pytest
+
+from redirect_validation import ValidationReport
+
+
+@pytest.mark.parametrize(
+    "source, target, problem",
+    [
+        ("", "/b", "keys must be non-empty"),
+        ("bad_host/a", "/b", "host keys must be valid hostnames"),
+        ("/a b", "/b", "keys must not contain whitespace, control characters or backticks"),
+        ("/a`) || Path(`/b", "/b", "keys must not contain whitespace"),
+        ("/a?page=2", "/b", "keys must be paths without a query string or fragment"),
+        ("/a", "", "values must be non-empty"),
+        ("/a", "b", "values must start with '/' or be an absolute URL"),
+        ("/a", "/b\tc", "values must not contain whitespace or control characters"),
+        ("/a", "/price$1", "values must not contain '$'"),
+        ("/a", "https://bad_host/b", "values must be absolute URLs with a valid host and port"),
+        ("/a", "https://example.com:https/b", "values must be absolute URLs with a valid host"),
+    ],
+)
+def test_invalid_entry_is_reported(source, target, problem):
+    report = ValidationReport()
+    report.check({source: target, "/ok": "https://Example.com:8443/ok?x=1"}, "map")
+
+    assert report.count == 1
+    assert report.issues[0].problem.startswith(problem)
+    assert (report.issues[0].source, report.issues[0].target) == (source, target)
+
+
+def test_every_invalid_entry_is_counted_and_the_first_kept():
+    redirects = {f"/ok/{i}": f"/new/{i}" for i in range(10)}
+    redirects.update({f"/bad/{i}": f"relative/{i}" for i in range(5)})
+    report = ValidationReport(limit=2)
+
+    report.check(redirects, "map")
+    report.check({"docs.example.com/": "https://docs.example.com/v1"}, "prefixes", prefix=True)
+
+    assert report.count == 6
+    assert [issue.source for issue in report.issues] == ["/bad/0", "/bad/1"]
+    assert report.summary() == (
+        "6 invalid entries, first: map values must start with '/' or be an absolute URL: "
+        "/bad/0 -> relative/0"
+    )
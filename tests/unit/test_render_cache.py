@@ -0,0 +1,65 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+import json
+
+from render_cache import RenderCache, serialize_members, splice_config
+
+
+def test_spliced_config_matches_whole_serialization():
+    routers = {"r-0": {"rule": "Path(`/a`)"}, "r-1": {"rule": "Path(`/é`)"}}
+    middlewares = {"m-0": {"redirectRegex": {"regex": "^a$"}}}
+
+    spliced = splice_config(
+        [serialize_members({"r-0": routers["r-0"]}), serialize_members({"r-1": routers["r-1"]})],
+        [serialize_members(middlewares), serialize_members({})],
+    )
+
+    config = {"http": {"routers": routers, "middlewares": middlewares}}
+    assert spliced == json.dumps(config, separators=(",", ":"))
+
+
+def test_cache_keeps_only_fragments_used_by_the_last_render(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = RenderCache(path, "app")
+    cache.put(cache.key("0", "/a", "/b", None), ("r-a", "m-a"))
+    cache.put(cache.key("1", "/c", "/d", None), ("r-c", "m-c"))
+    cache.save()
+
+    cache = RenderCache(path, "app")
+    assert cache.get(cache.key("0", "/a", "/b", None)) == ("r-a", "m-a")
+    assert cache.get(cache.key("1", "/c", "/changed", None)) is None
+    cache.save()
+
+    cache = RenderCache(path, "app")
+    assert cache.get(cache.key("1", "/c", "/d", None)) is None
+    assert cache.get(cache.key("0", "/a", "/b", None)) == ("r-a", "m-a")
+
+
+def test_cache_discarded_when_signature_changes(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = RenderCache(path, "app:all")
+    cache.put(cache.key("0", "/a", "/b", None), ("r-a", "m-a"))
+    cache.save()
+
+    cache = RenderCache(path, "app:https")
+    assert cache.get(cache.key("0", "/a", "/b", None)) is None
+
+
+def test_shards_not_rendered_keep_their_fragments(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = RenderCache(path, "app")
+    cache.put(cache.key("0", "/a", "/b", None), ("r-a", "m-a"), "1")
+    cache.put(cache.key("0", "/c", "/d", None), ("r-c", "m-c"), "2")
+    cache.save()
+
+    cache = RenderCache(path, "app")
+    cache.put(cache.key("0", "/a", "/changed", None), ("r-a2", "m-a2"), "1")
+    cache.save(shards={"1", "2"})
+
+    cache = RenderCache(path, "app")
+    assert cache.get(cache.key("0", "/c", "/d", None), "2") == ("r-c", "m-c")
+    assert cache.get(cache.key("0", "/a", "/b", None), "1") is None
+    cache.save(shards={"1"})
+
+    assert "2" not in json.loads(path.read_text())["shards"]
@@ -0,0 +1,111 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+import io
+import json
+
+import pytest
+
+from redirect_render import RedirectRenderer
+from render_cli import main
+
+MAP = {
+    "/old": "/new",
+    "docs.example.com": {"/guide": "https://example.com/guide"},
+    "/docs/v1/a": "/docs/latest/a",
+    "/docs/v1/b": "/docs/latest/b",
+}
+REDIRECTS = {
+    "/old": "/new",
+    "docs.example.com/guide": "https://example.com/guide",
+    "/docs/v1/a": "/docs/latest/a",
+    "/docs/v1/b": "/docs/latest/b",
+}
+
+
+def _render(argv, stdin=""):
+    stdout, stderr = io.StringIO(), io.StringIO()
+    status = main(argv, stdin=io.StringIO(stdin), stdout=stdout, stderr=stderr)
+    return status, stdout.getvalue(), stderr.getvalue()
+
+
+@pytest.mark.parametrize("layout", ["per-entry", "compact", "shared-middleware"])
+@pytest.mark.parametrize("compress", [False, True])
+def test_streamed_config_matches_charm_render(tmp_path, layout, compress):
+    path = tmp_path / "map.json"
+    path.write_text(json.dumps(MAP))
+    options = {"redirect_layout": layout, "compress_redirects": compress}
+
+    argv = [str(path), "--app-name", "app", "--layout", layout]
+    status, stdout, _ = _render(argv + ["--compress"] if compress else argv)
+
+    assert status == 0
+    expected = RedirectRenderer("app", options).build_config(REDIRECTS)
+    assert stdout == json.dumps(expected, separators=(",", ":")) + "\n"
+
+
+def test_map_read_from_stdin():
+    status, stdout, _ = _render(["--entrypoints", "https"], stdin="/a,/b\n/c,/d\n")
+
+    assert status == 0
+    routers = json.loads(stdout)["http"]["routers"]
+    assert len(routers) == 2
+    assert all(router["entryPoints"] == ["websecure"] for router in routers.values())
+
+
+@pytest.mark.parametrize(
+    "stdin, error",
+    [
+        ("", "at least one redirect must be configured"),
+        ("/a,/b\n/b,/a\n", "redirect cycle: /a -> /b -> /a"),
+        (
+            "/a: relative\n",
+            "redirect map values must start with '/' or be an absolute URL: /a -> relative",
+        ),
+    ],
+)
+def test_invalid_map_exits_non_zero(stdin, error):
+    status, stdout, stderr = _render([], stdin=stdin)
+
+    assert status == 1
+    assert stdout == ""
+    assert stderr == f"error: {error}\n"
+
+
+def test_every_invalid_entry_is_listed():
+    status, _, stderr = _render([], stdin="/a,relative\nb,/c\n/d,/e\n/f g,/h\n")
+
+    assert status == 1
+    assert stderr.splitlines() == [
+        "error: redirect map keys must start with '/': b -> /c",
+        "error: redirect map values must start with '/' or be an absolute URL: /a -> relative",
+        "error: redirect map keys must not contain whitespace, control characters or "
+        "backticks: /f g -> /h",
+    ]
+
+
+def test_prefix_map_renders_prefix_rules(tmp_path):
+    prefix_map = tmp_path / "prefix.yaml"
+    prefix_map.write_text("/blog: /news\n")
+
+    status, stdout, _ = _render(["--prefix-map", str(prefix_map)], stdin="/blog/keep,/kept\n")
+
+    assert status == 0
+    rules = [router["rule"] for router in json.loads(stdout)["http"]["routers"].values()]
+    assert rules == ["Path(`/blog/keep`)"] * 2 + ["PathPrefix(`/blog/`) || Path(`/blog`)"] * 2
+
+
+def test_options_are_checked_like_the_charm_checks_them():
+    status, _, stderr = _render(["--priority-base", "-1"], stdin="/a,/b\n")
+
+    assert status == 1
+    assert stderr == "error: router_priority_base must not be negative\n"
+
+
+def test_compact_layout_warns_about_long_middleware_chains(caplog):
+    stdin = "".join(f"/old/{i},/new/{i}\n" for i in range(12))
+
+    status, _, _ = _render(["--layout", "compact"], stdin=stdin)
+
+    assert status == 0
+    assert "compact layout chains 12 redirectRegex middlewares for 12 redirects" in caplog.text
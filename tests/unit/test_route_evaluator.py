@@ -0,0 +1,143 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+import re
+
+import pytest
+
+from redirect_render import RedirectRenderer
+from route_evaluator import RouteIndex, go_template, parse_rule
+
+
+def _redirect(regex, replacement):
+    return {"redirectRegex": {"regex": regex, "replacement": replacement, "permanent": True}}
+
+
+def _config(routers, middlewares):
+    return {"http": {"routers": routers, "middlewares": middlewares}}
+
+
+def test_parse_rule_expands_alternatives():
+    rule = "(Host(`a.example.com`) && Path(`/x`)) || Path(`/y`) || PathPrefix(`/z/`)"
+
+    assert parse_rule(rule) == [
+        {"Host": "a.example.com", "Path": "/x"},
+        {"Path": "/y"},
+        {"PathPrefix": "/z/"},
+    ]
+    with pytest.raises(ValueError):
+        parse_rule("Path(`/a`) && Path(`/b`)")
+    with pytest.raises(ValueError):
+        parse_rule("Method(`GET`)")
+
+
+def test_go_template():
+    match = re.match(r"^(https?://[^/]+)/old(/.*)?$", "http://example.com/old/page")
+
+    assert go_template("${1}/new${2}", match.re)(match) == "http://example.com/new/page"
+    assert go_template(r"$1\d${9}", match.re)(match) == r"http://example.com\d"
+
+
+def test_highest_priority_router_wins_and_tls_routers_serve_https():
+    config = _config(
+        {
+            "any": {"rule": "Path(`/a`)", "middlewares": ["to-b"]},
+            "scoped": {
+                "rule": "Host(`docs.example.com`) && Path(`/a`)",
+                "middlewares": ["to-c"],
+            },
+            "prefix-tls": {"rule": "PathPrefix(`/`)", "middlewares": ["to-d"], "tls": {}},
+        },
+        {
+            "to-b": _redirect(r"^(https?://[^/]+)/a$", "${1}/b"),
+            "to-c": _redirect(r"^(https?://docs\.example\.com(?::[0-9]+)?)/a$", "${1}/c"),
+            "to-d": _redirect(r"^https?://[^/]+/.*$", "https://elsewhere.example.com/d"),
+        },
+    )
+    index = RouteIndex(config)
+
+    assert index.redirect("http://www.example.com/a") == ("any", "http://www.example.com/b")
+    assert index.redirect("http://DOCS.example.com:8080/a") == (
+        "scoped",
+        "http://docs.example.com:8080/c",
+    )
+    assert index.redirect("https://www.example.com/a") == (
+        "prefix-tls",
+        "https://elsewhere.example.com/d",
+    )
+    assert index.redirect("http://www.example.com/other") == (None, None)
+
+
+def test_query_string_defeats_anchored_regex():
+    config = _config(
+        {"r": {"rule": "Path(`/a`)", "middlewares": ["m"]}},
+        {"m": _redirect(r"^(https?://[^/]+)/a$", "${1}/b")},
+    )
+
+    assert RouteIndex(config).redirect("http://example.com/a?x=1") == ("r", None)
+
+
+def test_evaluate_follows_hops_and_detects_loops():
+    config = _config(
+        {
+            "a": {"rule": "Path(`/a`)", "middlewares": ["to-b"]},
+            "b": {"rule": "Path(`/b`)", "middlewares": ["to-c"]},
+            "x": {"rule": "Path(`/x`)", "middlewares": ["to-y"]},
+            "y": {"rule": "Path(`/y`)", "middlewares": ["to-x"]},
+        },
+        {
+            "to-b": _redirect(r"^(https?://[^/]+)/a$", "${1}/b"),
+            "to-c": _redirect(r"^(https?://[^/]+)/b$", "${1}/c"),
+            "to-x": _redirect(r"^(https?://[^/]+)/y$", "${1}/x"),
+            "to-y": _redirect(r"^(https?://[^/]+)/x$", "${1}/y"),
+        },
+    )
+    index = RouteIndex(config)
+
+    chained = index.evaluate("http://example.com/a")
+    assert (chained.target, chained.hops, chained.router, chained.loop) == (
+        "http://example.com/c",
+        2,
+        "a",
+        False,
+    )
+    assert index.evaluate("http://example.com/x").loop
+    assert index.evaluate("http://example.com/c").target is None
+    with pytest.raises(ValueError):
+        index.evaluate("/relative")
+
+
+@pytest.mark.parametrize("priority_base", [0, 1000])
+@pytest.mark.parametrize("compress", [False, True])
+def test_compact_layout_redirects_like_per_entry(priority_base, compress):
+    redirects = {
+        "/b": "/unscoped",
+        "x.com/b": "/scoped",
+        "/docs": "/exact",
+        "/docs/v1/a": "/docs/v2/a",
+        "/docs/v1/b": "/docs/v2/b",
+        "/docs/v1/c": "/docs/v2/c",
+        "y.com/docs/v1/b": "/scoped-b",
+        "/a/long/exact/path": "/elsewhere",
+        "x.com/docs/": "/prefixed",
+    }
+    prefix_redirects = {"x.com/docs/": "/prefixed"}
+    urls = [
+        f"https://{host}{path}"
+        for host in ("x.com", "y.com")
+        for path in ("/b", "/docs", "/docs/v1/a", "/docs/v1/b", "/a/long/exact/path")
+    ]
+
+    def redirects_of(layout):
+        options = {
+            "redirect_layout": layout,
+            "compress_redirects": compress,
+            "router_priority_base": priority_base,
+        }
+        renderer = RedirectRenderer("app", options, prefix_redirects)
+        index = RouteIndex(renderer.build_config(redirects))
+        return [index.redirect(url)[1] for url in urls]
+
+    assert redirects_of("compact") == redirects_of("per-entry")
+    assert redirects_of("compact")[:2] == ["https://x.com/scoped", "https://x.com/prefixed"]
+    assert redirects_of("per-entry")[8] == "https://y.com/scoped-b"
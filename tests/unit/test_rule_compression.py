@@ -0,0 +1,34 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+from rule_compression import RedirectGroup, compress_redirects, is_equivalent, shared_suffix
+
+
+def test_shared_suffix_stops_at_segment_boundary():
+    assert shared_suffix("/docs/v1/page", "/docs/latest/page") == "/page"
+    assert shared_suffix("/a/xpage", "/b/ypage") is None
+    assert shared_suffix("/a", "/x/a") == "/a"
+    assert shared_suffix("/a", "/a") is None
+
+
+def test_compress_groups_prefix_rewrites():
+    redirects = {
+        "/docs/v1/install": "/docs/latest/install",
+        "/docs/v1/faq/networking": "/docs/latest/faq/networking",
+        "/blog": "/news",
+        "/docs/v1/upgrade": "https://ubuntu.net/upgrade",
+    }
+
+    remaining, groups = compress_redirects(redirects)
+
+    assert remaining == {"/blog": "/news", "/docs/v1/upgrade": "https://ubuntu.net/upgrade"}
+    assert groups == [RedirectGroup("/docs/v1", "/docs/latest", ("/install", "/faq/networking"))]
+    assert groups[0].regex == r"^(https?://[^/]+)/docs/v1(/install|/faq/networking)$"
+    assert groups[0].replacement == "${1}/docs/latest${2}"
+
+
+def test_group_not_equivalent_to_different_map():
+    group = RedirectGroup("/old", "/new", ("/a", "/b"))
+
+    assert is_equivalent(group, {"/old/a": "/new/a", "/old/b": "/new/b"})
+    assert not is_equivalent(group, {"/old/a": "/new/a", "/old/b": "/elsewhere"})
@@ -0,0 +1,29 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+from sharding import HashRing, shard_key, shard_redirects
+
+
+def test_shard_key():
+    assert shard_key("/docs/a", "host") == ""
+    assert shard_key("docs.example.com/a/b", "host") == "docs.example.com"
+    assert shard_key("docs.example.com/a/b", "prefix") == "docs.example.com/a"
+    assert shard_key("/a/b", "prefix") == "/a"
+
+
+def test_adding_a_shard_only_moves_keys_to_it():
+    keys = [f"host-{i}.example.com" for i in range(1000)]
+    before = HashRing([1, 2, 3])
+    after = HashRing([1, 2, 3, 4])
+
+    moved = [key for key in keys if before.shard_for(key) != after.shard_for(key)]
+
+    assert moved
+    assert all(after.shard_for(key) == 4 for key in moved)
+    assert len(moved) < len(keys) / 2
+
+
+def test_single_shard_gets_whole_map():
+    redirects = {"a.example.com/x": "/y", "/z": "/w"}
+
+    assert shard_redirects(redirects, [7], "host") == {7: redirects}
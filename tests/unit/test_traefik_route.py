@@ -0,0 +1,133 @@
+# Copyright 2026 alexlukens
+# See LICENSE file for licensing details.
+
+import dataclasses
+import json
+
+import ops
+from charms.traefik_k8s.v0.traefik_route import TraefikRouteProvider, TraefikRouteRequirer
+from ops import testing
+
+PROVIDER_META = {"name": "traefik", "provides": {"traefik-route": {"interface": "traefik_route"}}}
+REQUIRER_META = {"name": "route", "requires": {"traefik-route": {"interface": "traefik_route"}}}
+CONFIG = json.dumps({"http": {"routers": {"r": {"rule": "Path(`/a`)"}}}}, separators=(",", ":"))
+
+
+class _ProviderCharm(ops.CharmBase):
+    def __init__(self, framework: ops.Framework):
+        super().__init__(framework)
+        self.traefik_route = TraefikRouteProvider(self, external_host="example.com")
+        self.parsed = []
+        framework.observe(self.traefik_route.on.ready, self._on_ready)
+
+    def _on_ready(self, event: ops.RelationEvent) -> None:
+        if self.traefik_route.is_dynamic_config_changed(event.relation):
+            self.parsed.append(self.traefik_route.get_parsed_dynamic_config(event.relation))
+            self.traefik_route.mark_dynamic_config_applied(event.relation)
+
+
+class _RequirerCharm(ops.CharmBase):
+    def __init__(self, framework: ops.Framework):
+        super().__init__(framework)
+        relation = self.model.get_relation("traefik-route")
+        self.traefik_route = TraefikRouteRequirer(self, relation, "traefik-route")
+
+
+def _count_databag_reads(monkeypatch) -> list:
+    reads = []
+    original = ops.model.RelationData.__getitem__
+
+    def _getitem(self, key):
+        reads.append(key)
+        return original(self, key)
+
+    monkeypatch.setattr(ops.model.RelationData, "__getitem__", _getitem)
+    return reads
+
+
+def test_provider_reads_remote_databag_once_per_dispatch(monkeypatch):
+    ctx = testing.Context(_ProviderCharm, meta=PROVIDER_META)
+    relation = testing.Relation(
+        endpoint="traefik-route", remote_app_data={"config": CONFIG, "raw": "True"}
+    )
+    state_in = testing.State(leader=True, relations={relation})
+
+    with ctx(ctx.on.update_status(), state_in) as manager:
+        provider = manager.charm.traefik_route
+        model_relation = manager.charm.model.get_relation("traefik-route")
+        reads = _count_databag_reads(monkeypatch)
+        for _ in range(3):
+            assert provider.is_ready(model_relation)
+            assert provider.get_dynamic_config(model_relation) == CONFIG
+            assert provider.is_raw_enabled(model_relation)
+            assert provider.get_static_config(model_relation) is None
+
+        assert [read for read in reads if read is model_relation.app] == [model_relation.app]
+
+
+def test_provider_only_parses_changed_configs():
+    ctx = testing.Context(_ProviderCharm, meta=PROVIDER_META)
+    relation = testing.Relation(endpoint="traefik-route", remote_app_data={"config": CONFIG})
+
+    with ctx(
+        ctx.on.relation_changed(relation), testing.State(leader=True, relations={relation})
+    ) as manager:
+        state = manager.run()
+        assert manager.charm.parsed == [json.loads(CONFIG)]
+
+    relation = state.get_relation(relation.id)
+    with ctx(ctx.on.relation_changed(relation), state) as manager:
+        state = manager.run()
+        assert manager.charm.parsed == []
+
+    changed = CONFIG.replace("/a", "/b")
+    relation = dataclasses.replace(
+        state.get_relation(relation.id), remote_app_data={"config": changed}
+    )
+    state = dataclasses.replace(state, relations={relation})
+    with ctx(ctx.on.relation_changed(relation), state) as manager:
+        manager.run()
+        assert manager.charm.parsed == [json.loads(changed)]
+
+
+def test_requirer_reads_traefik_address_once_per_dispatch(monkeypatch):
+    ctx = testing.Context(_RequirerCharm, meta=REQUIRER_META)
+    relation = testing.Relation(
+        endpoint="traefik-route",
+        remote_app_data={"external_host": "example.com", "scheme": "https"},
+    )
+
+    with ctx(ctx.on.update_status(), testing.State(leader=True, relations={relation})) as manager:
+        requirer = manager.charm.traefik_route
+        reads = _count_databag_reads(monkeypatch)
+        for _ in range(3):
+            assert (requirer.external_host, requirer.scheme) == ("example.com", "https")
+
+        assert len(reads) == 1
+
+
+def test_parsed_config_is_a_copy():
+    ctx = testing.Context(_ProviderCharm, meta=PROVIDER_META)
+    relation = testing.Relation(endpoint="traefik-route", remote_app_data={"config": CONFIG})
+
+    with ctx(ctx.on.update_status(), testing.State(leader=True, relations={relation})) as manager:
+        provider = manager.charm.traefik_route
+        model_relation = manager.charm.model.get_relation("traefik-route")
+        provider.get_parsed_dynamic_config(model_relation)["http"].clear()
+
+        assert provider.get_parsed_dynamic_config(model_relation) == json.loads(CONFIG)
+        # Reading the config does not count as applying it.
+        assert provider.is_dynamic_config_changed(model_relation)
+
+
+def test_parses_yaml_flow_mapping_config():
+    ctx = testing.Context(_ProviderCharm, meta=PROVIDER_META)
+    relation = testing.Relation(
+        endpoint="traefik-route", remote_app_data={"config": "{http: {routers: {}}}"}
+    )
+
+    with ctx(ctx.on.update_status(), testing.State(leader=True, relations={relation})) as manager:
+        model_relation = manager.charm.model.get_relation("traefik-route")
+        parsed = manager.charm.traefik_route.get_parsed_dynamic_config(model_relation)
+
+    assert parsed == {"http": {"routers": {}}}